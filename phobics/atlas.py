@@ -0,0 +1,59 @@
+# phobics/atlas.py
+import pygame
+from pygame import Rect
+
+class TextureAtlas:
+    """Packs many small surfaces into a few large pages.
+
+    rects maps a name to (page index, Rect) and handles maps it to a
+    subsurface of that page, so callers can blit either the handle or
+    (page, dest, rect) in one Surface.blits() batch. A surface larger than
+    a page gets a page of its own, sized to fit.
+    """
+    PAGE_SIZE = 1024
+    PAD = 1
+
+    def __init__(self, surfaces, page_size=PAGE_SIZE):
+        self.page_size = page_size
+        self.pages = []
+        self.rects = {}
+        self.handles = {}
+        self._pack(surfaces)
+
+    def _pack(self, surfaces):
+        # shelf packing, tallest first so rows waste little height
+        order = sorted(surfaces.items(), key=lambda kv: (-kv[1].get_height(), -kv[1].get_width()))
+        placed = []; oversized = []
+        page = 0; x = y = shelf_h = 0
+        for name,surf in order:
+            w,h = surf.get_size()
+            if w > self.page_size or h > self.page_size:
+                oversized.append((name, surf)); continue
+            if x + w > self.page_size:
+                x = 0; y += shelf_h + self.PAD; shelf_h = 0
+            if y + h > self.page_size:
+                page += 1; x = y = shelf_h = 0
+            placed.append((name, surf, page, Rect(x, y, w, h)))
+            x += w + self.PAD; shelf_h = max(shelf_h, h)
+        page = placed[-1][2] + 1 if placed else 0
+        for name,surf in oversized:
+            placed.append((name, surf, page, surf.get_rect())); page += 1
+        sizes = {}
+        for _,_,p,r in placed:
+            pw,ph = sizes.get(p, (1,1)); sizes[p] = (max(pw, r.right), max(ph, r.bottom))
+        for p in range(len(sizes)):
+            surf = pygame.Surface(sizes[p], pygame.SRCALPHA)
+            if pygame.display.get_surface():
+                surf = surf.convert_alpha()
+            surf.fill((0,0,0,0))
+            self.pages.append(surf)
+        for name,surf,p,r in placed:
+            self.pages[p].blit(surf, r, area=Rect(0, 0, r.width, r.height), special_flags=pygame.BLEND_RGBA_MAX)
+            self.rects[name] = (p, r)
+            self.handles[name] = self.pages[p].subsurface(r)
+
+    def __contains__(self, name):
+        return name in self.handles
+
+    def get(self, name):
+        return self.handles.get(name)
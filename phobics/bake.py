@@ -0,0 +1,76 @@
+# phobics/bake.py
+# Release-time asset bake: textures are resized to the size they are drawn at
+# and stored premultiplied, sounds are re-encoded in the mixer's own format.
+# SafeLoader picks the results up from BAKED_DIR (see loader._open_baked).
+#
+#   python -m phobics.bake [manifest.json]
+#
+# The manifest maps texture keys to [w, h]; without one, Engine.SPRITE_SIZES
+# (the sizes reset_stage/fire_projectile create entities with) is used.
+import os
+import sys
+import json
+import wave
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+import pygame
+
+from .settings import TEX_DIR, SND_DIR, BAKED_DIR
+from .loader import TEXTURE_FILES, SOUND_FILES
+
+# must match pygame.mixer.pre_init in main/Engine
+MIXER_FORMAT = (44100, -16, 2)
+
+def default_manifest():
+    from .engine import Engine
+    return {k: list(size) for k,size in Engine.SPRITE_SIZES.items()}
+
+def bake_texture(src, dst, size):
+    img = pygame.image.load(src).convert_alpha()
+    if img.get_size() != tuple(size):
+        img = pygame.transform.smoothscale(img, tuple(size))
+    img = img.premul_alpha()
+    pygame.image.save(img, dst)
+
+def bake_sound(src, dst):
+    # Sound() converts to the mixer format on load; get_raw() is that PCM
+    freq,fmt,channels = pygame.mixer.get_init()
+    raw = pygame.mixer.Sound(src).get_raw()
+    with wave.open(dst, "wb") as w:
+        w.setnchannels(channels); w.setsampwidth(abs(fmt)//8); w.setframerate(freq)
+        w.writeframes(raw)
+
+def bake(manifest=None, out_dir=BAKED_DIR):
+    manifest = manifest or default_manifest()
+    pygame.mixer.pre_init(*MIXER_FORMAT, 512)
+    pygame.init()
+    pygame.display.set_mode((1,1))
+    if pygame.mixer.get_init()[:3] != MIXER_FORMAT:
+        print("[bake] mixer opened as", pygame.mixer.get_init(), "expected", MIXER_FORMAT)
+    tex_out = os.path.join(out_dir, "textures"); snd_out = os.path.join(out_dir, "sounds")
+    os.makedirs(tex_out, exist_ok=True); os.makedirs(snd_out, exist_ok=True)
+    count = 0
+    for key,fn in TEXTURE_FILES.items():
+        src = os.path.join(TEX_DIR, fn)
+        if key not in manifest or not os.path.exists(src): continue
+        try:
+            bake_texture(src, os.path.join(tex_out, fn), manifest[key]); count += 1
+        except Exception as e:
+            print(f"[bake] {fn} failed:", e)
+    for key,fn in SOUND_FILES.items():
+        src = os.path.join(SND_DIR, fn)
+        if not os.path.exists(src): continue
+        try:
+            bake_sound(src, os.path.join(snd_out, fn)); count += 1
+        except Exception as e:
+            print(f"[bake] {fn} failed:", e)
+    return count
+
+if __name__ == "__main__":
+    manifest = None
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    n = bake(manifest)
+    print(f"[bake] wrote {n} files to {BAKED_DIR}")
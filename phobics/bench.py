@@ -0,0 +1,237 @@
+# phobics/bench.py
+# Headless scenario benchmarks. Each scenario drives one Engine through a
+# fixed workload with a fixed seed and reports frames/sec, frame-time
+# percentiles, Surfaces built per frame and peak RSS. Unless
+# PHOBICS_SAVES_DIR is set, saves go to a temp directory that is removed at
+# exit, so the real saves/ is never touched.
+#
+#   python -m phobics.bench [scenario ...] [--frames N] [--size WxH] [--out results.json]
+#
+# Results are printed as JSON (and written to --out). Exits 1 when a
+# steady-state scenario (all but ALLOCATING) builds any Surface per frame.
+import os
+import sys
+import atexit
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+if not os.environ.get("PHOBICS_SAVES_DIR"):  # read by settings at import
+    _saves = tempfile.TemporaryDirectory(prefix="phobics-bench-")
+    atexit.register(_saves.cleanup)
+    os.environ["PHOBICS_SAVES_DIR"] = _saves.name
+import pygame
+
+SEED = 1234
+WARMUP = 10
+SIZE = (1280, 720)
+MANY_SLOTS = 200
+
+def memory():
+    # (current RSS, peak RSS) in bytes; None where the platform can't tell
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            from ctypes import wintypes
+            class PMC(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + \
+                           [(n, ctypes.c_size_t) for n in ("PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage",
+                            "QuotaPagedPoolUsage", "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+            pmc = PMC(); pmc.cb = ctypes.sizeof(PMC)
+            ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(pmc), pmc.cb)
+            return pmc.WorkingSetSize, pmc.PeakWorkingSetSize
+        except Exception:
+            return None, None
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak *= 1 if sys.platform == "darwin" else 1024  # bytes on macOS, KiB elsewhere
+    except Exception:
+        peak = None
+    try:
+        with open("/proc/self/statm") as f:
+            rss = int(f.read().split()[1])*os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        rss = None
+    if rss is not None and peak is not None: peak = max(peak, rss)  # the two are sampled differently
+    return rss, peak
+
+def step(engine, dt=1.0/60, events=()):
+    # one frame of main.py's loop, minus the clock wait; returns work ms
+    t0 = time.perf_counter()
+    engine.begin_frame()
+    engine.handle_events(events)
+    engine.autosave_tick()
+    engine.update(dt)
+    engine.screen.fill((0,0,0))
+    engine.draw()
+    pygame.display.flip()
+    engine.end_frame()
+    return (time.perf_counter() - t0)*1000.0
+
+# ---------- scenarios: setup(engine) -> per-frame hook or None ----------
+def play(engine, stage):
+    from . import scenes
+    engine.stage = stage; engine.reset_stage()
+    engine.scenes.reset(scenes.Gameplay(engine))
+
+def title(engine):
+    from . import scenes
+    engine.scenes.reset(scenes.Title(engine))
+
+def front_menu(engine):
+    from . import scenes
+    engine.scenes.reset(scenes.FrontMenu(engine))
+
+def stage1(engine):
+    play(engine, 1)
+
+def stage10(engine):
+    play(engine, engine.MAX_STAGES)
+
+def shop(engine):
+    play(engine, 3); step(engine)  # the shop freezes the last gameplay frame
+    engine.open_shop()
+
+def slot_menu(engine):
+    # MANY_SLOTS saved games; the browser pages forward and back
+    from . import scenes
+    data = engine.progress_data()
+    for i in range(1, MANY_SLOTS+1):
+        data = dict(data, stage=1 + i % engine.MAX_STAGES, timestamp=time.time() - i)
+        engine.write_slot(i, data)
+    engine.save_writer.flush()
+    engine.scenes.reset(scenes.FrontMenu(engine)); engine.open_load_slot_menu()
+    state = {"n": 0, "dir": "page_next"}
+    def hook(engine):
+        state["n"] += 1
+        if state["n"] % 15: return
+        pages = engine.slot_pages()[1]
+        if engine.slot_page >= pages-1: state["dir"] = "page_prev"
+        elif engine.slot_page <= 0: state["dir"] = "page_next"
+        engine.handle_action(state["dir"], None)
+    return hook
+
+def restart_storm(engine):
+    # a death every frame: reset_stage and its transition GC each time
+    play(engine, 5)
+    return lambda engine: engine.restart_stage()
+
+def asset_reload(engine):
+    # the R key every 10 frames
+    play(engine, 1)
+    state = {"n": 0}
+    def hook(engine):
+        state["n"] += 1
+        if state["n"] % 10 == 0: engine.reload_assets()
+    return hook
+
+SCENARIOS = {
+    "title": title,
+    "front_menu": front_menu,
+    "stage1": stage1,
+    "stage10": stage10,
+    "shop": shop,
+    "slot_menu": slot_menu,
+    "restart_storm": restart_storm,
+    "asset_reload": asset_reload,
+}
+# scenarios that build Surfaces by design, exempt from the surfaces gate
+ALLOCATING = {
+    "slot_menu": "each page turn rebuilds the panel rows and their text",
+    "asset_reload": "each reload decodes the textures and rescales the sprites again",
+}
+
+def run_scenario(engine, name, frames=300):
+    from .perf import percentile
+    from .surfpool import SurfaceCounter
+    random.seed(SEED)
+    hook = SCENARIOS[name](engine)
+    for _ in range(WARMUP):
+        if hook: hook(engine)
+        step(engine)
+    gcp = engine.gc_policy; gc0 = (gcp.collections, gcp.total_ms)
+    times = []
+    with SurfaceCounter() as counter:
+        t0 = time.perf_counter()
+        for _ in range(frames):
+            t = time.perf_counter()
+            if hook: hook(engine)
+            step(engine)
+            times.append((time.perf_counter() - t)*1000.0)
+        wall = time.perf_counter() - t0
+    times.sort()
+    rss,peak = memory()
+    return {
+        "frames": frames,
+        "fps": frames/wall if wall else 0.0,
+        "mean_ms": sum(times)/len(times),
+        "p50_ms": percentile(times, 50), "p95_ms": percentile(times, 95), "p99_ms": percentile(times, 99),
+        "max_ms": times[-1],
+        "surfaces_per_frame": counter.count/frames, "steady": name not in ALLOCATING,
+        "gc_collections": gcp.collections - gc0[0], "gc_ms": gcp.total_ms - gc0[1],
+        "rss_bytes": rss, "peak_rss_bytes": peak,  # peak is process-wide, so it only grows scenario to scenario
+    }
+
+def make_engine(size=SIZE):
+    from .engine import Engine
+    pygame.mixer.pre_init(44100, -16, 2, 512)
+    pygame.init()
+    screen = pygame.display.set_mode(size)
+    return Engine(screen)
+
+def close_engine(engine):
+    if engine.journal is not None: engine.journal.close()
+    engine.thumbnailer.stop()
+    engine.slot_index.flush()
+    engine.save_writer.stop()
+    engine.gc_policy.close()
+
+def run(names=None, frames=300, size=SIZE):
+    random.seed(SEED)
+    engine = make_engine(size)
+    results = {}
+    try:
+        for name in names or SCENARIOS:
+            results[name] = run_scenario(engine, name, frames)
+            r = results[name]
+            print(f"[bench] {name:<14} {r['fps']:8.1f} fps  p50 {r['p50_ms']:6.2f}  p95 {r['p95_ms']:6.2f}  "
+                  f"p99 {r['p99_ms']:6.2f} ms  surfaces/frame {r['surfaces_per_frame']:.2f}", file=sys.stderr)
+    finally:
+        close_engine(engine)
+    return {
+        "seed": SEED, "frames": frames, "size": list(size), "time": time.time(),
+        "python": platform.python_version(), "pygame": pygame.version.ver, "platform": platform.platform(),
+        "scenarios": results,
+    }
+
+def parse_size(text):
+    w,h = text.lower().split("x")
+    return int(w), int(h)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m phobics.bench")
+    ap.add_argument("scenarios", nargs="*", metavar="scenario", help="any of: " + ", ".join(SCENARIOS))
+    ap.add_argument("--frames", type=int, default=300, help="measured frames per scenario (after %d warmup)" % WARMUP)
+    ap.add_argument("--size", type=parse_size, default=SIZE, help="window size, WxH")
+    ap.add_argument("--out", help="also write the JSON here")
+    args = ap.parse_args(argv)
+    unknown = [n for n in args.scenarios if n not in SCENARIOS]
+    if unknown: ap.error("unknown scenario: " + ", ".join(unknown))
+    report = run(args.scenarios, args.frames, args.size)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f: f.write(text)
+    print(text)
+    bad = [n for n,r in report["scenarios"].items() if r["steady"] and r["surfaces_per_frame"] > 0]
+    for n in bad:
+        print(f"[bench] {n}: {report['scenarios'][n]['surfaces_per_frame']:.2f} Surfaces per frame in a steady-state scenario", file=sys.stderr)
+    return 1 if bad else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+# phobics/controls.py
+import pygame
+
+# raw input -> action name; scenes look actions up in their ACTIONS table
+BINDINGS = {
+    (pygame.KEYDOWN, pygame.K_ESCAPE): "back",
+    (pygame.KEYDOWN, pygame.K_RETURN): "confirm",
+    (pygame.KEYDOWN, pygame.K_SPACE): "fire",
+    (pygame.KEYDOWN, pygame.K_r): "reload",
+    (pygame.KEYDOWN, pygame.K_F5): "quicksave",
+    (pygame.KEYDOWN, pygame.K_F9): "quickload",
+    (pygame.KEYDOWN, pygame.K_F3): "perf",
+    (pygame.KEYDOWN, pygame.K_F4): "trace_dump",
+    (pygame.KEYDOWN, pygame.K_PAGEUP): "page_prev",
+    (pygame.KEYDOWN, pygame.K_PAGEDOWN): "page_next",
+    (pygame.KEYDOWN, pygame.K_BACKSPACE): "erase",
+    (pygame.MOUSEBUTTONDOWN, 1): "click",
+}
+# every action a key press can produce ("text"/"key" are unbound printable/other keys)
+KEY_ACTIONS = tuple(a for (t,_),a in BINDINGS.items() if t == pygame.KEYDOWN) + ("text", "key")
+# handled by the engine (or ignored) on any screen, never "press any key"
+HOTKEY_ACTIONS = ("reload", "perf", "trace_dump", "quicksave", "quickload")
+
+# nothing else is ever read, so SDL does not queue it
+ALLOWED_EVENTS = [pygame.QUIT, pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION]
+
+def install():
+    # call once the display is up
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed(ALLOWED_EVENTS)
+
+class InputMap:
+    def __init__(self, bindings=None):
+        self.bindings = dict(BINDINGS if bindings is None else bindings)
+
+    def translate(self, events):
+        # [(action, event)]; a burst of MOUSEMOTION becomes one trailing "aim"
+        out = []; motion = None
+        for ev in events:
+            t = ev.type
+            if t == pygame.MOUSEMOTION:
+                motion = ev; continue
+            if t == pygame.QUIT:
+                out.append(("quit", ev)); continue
+            if t == pygame.KEYDOWN:
+                action = self.bindings.get((t, ev.key))
+                if action is None:
+                    action = "text" if ev.unicode and ev.unicode.isprintable() else "key"
+                out.append((action, ev)); continue
+            if t == pygame.MOUSEBUTTONDOWN:
+                action = self.bindings.get((t, ev.button))
+                if action is not None: out.append((action, ev))
+        if motion is not None:
+            out.append(("aim", motion))
+        return out
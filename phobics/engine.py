@@ -1,5 +1,6 @@
 # phobics/engine.py
 import os
+import io
 import sys
 import math
 import random
@@ -9,13 +10,50 @@ import pygame
 from pygame import Rect
 
 from .loader import SafeLoader
+from .atlas import TextureAtlas
+from .saves import SlotIndex, SaveWriter
+from . import snapshot
+from .journal import SlotJournal
+from .thumbs import ThumbnailWorker, ThumbnailCache
 from .settings import MUSIC_DIR, STAGES_JSON, SAVES_DIR
 from . import ui
+from . import widgets
+from .hud import Hud
+from .perf import FrameTimer, PerfOverlay
+from .trace import TRACER, traced
+from .flight import FlightRecorder
+from .sampler import StackSampler
+from .gcpolicy import GcPolicy
+from .surfpool import SurfacePool
+from . import scenes
+from .controls import InputMap
+
+# engine asset key -> (loader table, loader key)
+ASSET_KEYS = {
+    "player": ("texture", "player"),
+    "enemy": ("texture", "enemy"),
+    "collect": ("texture", "collect"),
+    "proj": ("texture", "proj"),
+    "arrow": ("texture", "arrow"),
+    "shoot": ("sound", "shoot"),
+    "hit": ("sound", "hit"),
+    "collect_snd": ("sound", "collect"),
+    "select": ("sound", "select"),
+}
 
 class Engine:
     FPS = 60
     MAX_STAGES = 10
-    SLOT_COUNT = 3
+    SLOT_COUNT = 3  # empty slots always offered; saved slots beyond this are listed too
+    ARROW_STEPS = 64  # pre-rendered aim arrow directions
+    # in-game sprite sizes (also the bake manifest, see phobics/bake.py)
+    SPRITE_SIZES = {
+        "player": (24,24),
+        "enemy": (32,32),
+        "collect": (20,20),
+        "proj": (10,10),
+        "arrow": (18,4),
+    }
 
     def __init__(self, screen):
         # screen: initialized pygame display surface
@@ -23,6 +61,8 @@ class Engine:
         self.screen = screen
         self.window_w, self.window_h = screen.get_size()
         self.clock = pygame.time.Clock()
+        self.gc_policy = GcPolicy()  # when the cyclic GC may run, see gcpolicy.py
+        self.surfaces = SurfacePool()  # per-frame scratch surfaces, recycled in draw()
 
         # stage/world defaults
         self.stage = 1
@@ -31,48 +71,43 @@ class Engine:
 
         self.loader = SafeLoader()
         self.loader.reload_all()
-        self.assets = {
-            "player": self.loader.textures["player"],
-            "enemy": self.loader.textures["enemy"],
-            "collect": self.loader.textures["collect"],
-            "proj": self.loader.textures["proj"],
-            "arrow": self.loader.textures["arrow"],
-            "shoot": self.loader.sounds.get("shoot"),
-            "hit": self.loader.sounds.get("hit"),
-            "collect_snd": self.loader.sounds.get("collect"),
-            "select": self.loader.sounds.get("select"),
-        }
+        self.assets = {}
+        self._scaled = {}  # (asset key, size) -> smoothscaled sprite
+        self._premul = set()  # asset keys holding premultiplied (baked) pixels
+        self.atlas = None  # built lazily from the sprites above, see ensure_atlas
+        self.watcher = None
+        self.sync_assets()
 
         self.title_music = os.path.join(MUSIC_DIR, "titlescreen.mp3")
         self.game_music = os.path.join(MUSIC_DIR, "gamemusic.mp3")
 
         self.stages_config = self.load_stages_config()
 
-        # UI states
-        self.paused = False
-        self.in_menu = False
-        self.in_options = False
-        self.menu_buttons = []
-        self.options_buttons = []
-
-        self.on_title = True
-        self.on_front_menu = False
-        self.front_menu_buttons = []
+        # UI state: one scene stack (see scenes.py), filled at the end of __init__
+        self.scenes = scenes.SceneStack()
+        self.menu_ui = None
+        self.options_ui = None
+        self.front_menu_ui = None
 
-        self.on_slot_menu = False
         self.slot_menu_mode = None
-        self.slot_buttons = []
-        self.on_stage_select = False
-        self.stage_buttons = []
+        self.slot_ui = None
+        self._slot_thumbs = []  # (slot index, widgets.Image) on the visible page
+        self.slot_page = 0
+        self.slot_sort = "index"
+        self.slot_query = ""
+        self._slot_rows = (None, [])  # (cache key, slot indices in browser order)
+        self.stage_ui = None
         self.selected_slot = None
 
         # world
         self.world_w, self.world_h = self.base_w, self.base_h
+        # synthetic stage config ({"enemies": n, "collectibles": n}) used instead of
+        # stages.json; stress stages keep their entities (no deaths), see phobics/scaling.py
+        self.stress = None
         # shop & money state
         self.just_reset = False
-        self.in_shop = False
         self.money = 0
-        self.shop_buttons = []
+        self.shop_ui = None
         self.shop_items = [
             { 'id':'shot_capacity','name':'+1 Shot Capacity','price':5,'desc':'Allows one extra quick shot'},
             { 'id':'move_speed','name':'Increase Move Speed','price':8,'desc':'Move a bit faster'},
@@ -93,6 +128,8 @@ class Engine:
         self.projectile = None
         self.projectile_v = (0,0)
         self.arrow_end = (0,0)
+        self.aim_pos = pygame.mouse.get_pos()  # updated by "aim" actions (controls.py)
+        self.controls = InputMap()
 
         # title animation
         self.title_alpha = 0.0
@@ -100,6 +137,7 @@ class Engine:
         self.title_start_time = time.time()
         self.title_prompt_visible = False
         self.title_prompt_time = 0.0
+        self._title_text = None  # see title_text
 
         # theme & resolution
         self.theme = 'dark'
@@ -111,9 +149,164 @@ class Engine:
 
         # audio & saves dir
         os.makedirs(SAVES_DIR, exist_ok=True)
+        self.save_writer = SaveWriter()
+        self.slot_index = SlotIndex(SAVES_DIR, self.save_writer)
+        self.active_slot = None  # slot receiving autosaves
+        self.journal = None
+        self.thumbnailer = ThumbnailWorker(self.save_writer)
+        self.thumb_cache = ThumbnailCache(ui.slots_per_page(self.window_h))
+        self.world_shot = None  # world area of the current game's last gameplay frame, for thumbnails
+        self.hud = Hud(self)
+        self.perf = FrameTimer()  # per-phase timings, F3 (see perf.py)
+        self.perf_overlay = PerfOverlay(self.perf)
+        if os.environ.get("PHOBICS_PERF"): self.perf.toggle()
+        self.flight = None  # see start_flight_recorder
+        self.sampler = None  # see start_sampler
 
         # start music
         self.play_title_music()
+        self.scenes.reset(scenes.Title(self))
+        self.gc_policy.freeze()  # assets, fonts and UI are loaded
+
+    @property
+    def paused(self):
+        # the world only runs while gameplay is the top scene
+        return not isinstance(self.scenes.top, scenes.Gameplay)
+
+    def aim(self, pos):
+        self.aim_pos = pos
+
+    @property
+    def aim_world(self):
+        # last known mouse position in world coordinates
+        return self.aim_pos[0] - (self.window_w - self.world_w)//2, self.aim_pos[1] - (self.window_h - self.world_h)//2
+
+    # ---------- assets / hot reload ----------
+    def sync_assets(self, loader_keys=None):
+        # copy loader entries into self.assets; loader_keys limits it to (kind, key) pairs
+        for name,(kind,key) in ASSET_KEYS.items():
+            if loader_keys is not None and (kind,key) not in loader_keys:
+                continue
+            if kind == "texture":
+                self.assets[name] = self.loader.textures[key]
+            else:
+                self.assets[name] = self.loader.sounds.get(key)
+            self.invalidate_asset(name)
+        self._premul = {name for name,(kind,key) in ASSET_KEYS.items() if kind == "texture" and key in self.loader.premultiplied}
+
+    def invalidate_asset(self, name):
+        for k in [k for k in self._scaled if k[0] == name]:
+            del self._scaled[k]
+        self.atlas = None
+
+    def scaled_sprite(self, name, size):
+        # smoothscale once per (asset, size) instead of every frame
+        surf = self._scaled.get((name, size))
+        if surf is None:
+            img = self.assets.get(name)
+            if not isinstance(img, pygame.Surface):
+                return None
+            surf = img if img.get_size() == size else pygame.transform.smoothscale(img, size)
+            self._scaled[(name, size)] = surf
+        return surf
+
+    def ensure_atlas(self):
+        # pack in-game sized sprites, loader fallbacks and drawn stamps into one atlas
+        if self.atlas is not None: return self.atlas
+        surfaces = {}
+        for name,size in self.SPRITE_SIZES.items():
+            surf = self.scaled_sprite(name, size)
+            if surf is not None: surfaces[f"{name}@{size[0]}x{size[1]}"] = surf
+        for key,surf in self.loader.fallbacks.items():
+            surfaces["fallback:"+key] = surf
+        cw,ch = self.SPRITE_SIZES["collect"]
+        stamp = pygame.Surface((cw,ch), pygame.SRCALPHA)
+        pygame.draw.ellipse(stamp, (180,140,60), (0,0,cw,ch))
+        surfaces["stamp:collect"] = stamp
+        length = self.SPRITE_SIZES["arrow"][0]; c = length + 2
+        for i in range(self.ARROW_STEPS):
+            a = 2*math.pi*i/self.ARROW_STEPS
+            stamp = pygame.Surface((2*c+1, 2*c+1), pygame.SRCALPHA)
+            pygame.draw.line(stamp, (0,200,200), (c,c), (c+math.cos(a)*length, c+math.sin(a)*length), 3)
+            surfaces[f"stamp:arrow:{i}"] = stamp
+        self.atlas = TextureAtlas(surfaces)
+        # sprite lookups now hand out atlas subsurfaces
+        for name,size in self.SPRITE_SIZES.items():
+            handle = self.atlas.get(f"{name}@{size[0]}x{size[1]}")
+            if handle is not None: self._scaled[(name, size)] = handle
+        return self.atlas
+
+    def blit_sprites(self, name, rects, ox, oy):
+        # one Surface.blits() call for many same-texture sprites; False when there is no surface
+        if not rects: return True
+        surf = self.scaled_sprite(name, rects[0].size)
+        if surf is None: return False
+        flags = pygame.BLEND_PREMULTIPLIED if name in self._premul else 0
+        self.screen.blits([(surf, (r.x+ox, r.y+oy), None, flags) for r in rects], doreturn=False)
+        return True
+
+    def blit_sprite(self, name, rect, ox, oy):
+        # draw a texture asset at rect (world coords); False when there is no surface
+        surf = self.scaled_sprite(name, rect.size)
+        if surf is None: return False
+        flags = pygame.BLEND_PREMULTIPLIED if name in self._premul else 0
+        self.screen.blit(surf, (rect.x+ox, rect.y+oy), special_flags=flags)
+        return True
+
+    @traced("assets")
+    def reload_assets(self):
+        # full reload (R key)
+        self.loader.reload_all()
+        self.sync_assets()
+        self.stages_config = self.load_stages_config()
+        self.gc_policy.freeze()
+
+    def start_flight_recorder(self):
+        if self.flight is None:
+            try: self.flight = FlightRecorder(writer=self.save_writer)
+            except Exception as e: print("[flight] disabled:", e)
+        return self.flight
+
+    def start_sampler(self, rate):
+        if self.sampler is None:
+            self.sampler = StackSampler(rate, 1000.0/self.FPS).start()
+        return self.sampler
+
+    def begin_frame(self):
+        self.gc_policy.begin_frame()
+        if self.sampler is not None: self.sampler.begin_frame()
+
+    def end_frame(self):
+        # after flip: scheduled collection, then this frame's GC pauses to the overlay/trace
+        self.gc_policy.end_frame()
+        self.perf.note("gc", self.gc_policy.frame_ms)
+
+    def record_frame(self, work_ms, dt):
+        if self.flight is not None: self.flight.record(self, work_ms, dt)
+        if self.sampler is not None: self.sampler.end_frame(work_ms)
+
+    def start_asset_watcher(self, interval=0.5):
+        from .watcher import AssetWatcher
+        if self.watcher is None:
+            self.watcher = AssetWatcher(interval).start()
+        return self.watcher
+
+    def poll_asset_changes(self):
+        # apply whatever the watcher found since last frame; only changed files are decoded
+        if self.watcher is None: return 0
+        changes = self.watcher.poll()
+        touched = set()
+        for kind,key,fileobj in changes:
+            if kind == "texture":
+                self.loader.reload_texture(key, fileobj); touched.add((kind,key))
+            elif kind == "sound":
+                self.loader.reload_sound(key, fileobj); touched.add((kind,key))
+            elif kind == "stages":
+                self.stages_config = self.load_stages_config()
+            print(f"[watch] reloaded {kind} {key or ''}".rstrip())
+        if touched:
+            self.sync_assets(touched)
+        return len(changes)
 
     # ---------- stage / saves ----------
     def load_stages_config(self):
@@ -139,27 +332,31 @@ class Engine:
         h=min(h, self.window_h-pad)
         return w,h
 
+    @traced("engine")
     def reset_stage(self):
         # mark that we just reset (used to avoid shop popping immediately)
         self.just_reset = True
+        self.gc_policy.transition()
         self.stages_config = self.load_stages_config()
         self.world_w, self.world_h = self.world_size()
-        self.player = Rect(40,40,24,24)
+        self.player = Rect((40,40), self.SPRITE_SIZES["player"])
         self.arrow_end = (self.player.centerx+10, self.player.centery)
-        cfg = self.stages_config.get(self.stage,{})
+        cfg = self.stress or self.stages_config.get(self.stage,{})
         num_collect = int(cfg.get("collectibles", 3 + self.stage)) if cfg else 3 + self.stage
         self.collectibles=[]
+        cw,ch = self.SPRITE_SIZES["collect"]
         for _ in range(num_collect):
             x = random.randint(30, max(30,self.world_w-30))
             y = random.randint(30, max(30,self.world_h-30))
-            self.collectibles.append(Rect(x-10,y-10,20,20))
+            self.collectibles.append(Rect(x-cw//2,y-ch//2,cw,ch))
         num_enemies = int(cfg.get("enemies",2 + self.stage)) if cfg else 2 + self.stage
         self.enemies=[]
+        ew,eh = self.SPRITE_SIZES["enemy"]
         for _ in range(num_enemies):
             x=random.randint(50, max(50, self.world_w-50))
             y=random.randint(50, max(50, self.world_h-50))
             vx=random.choice([-3,-2,2,3]); vy=random.choice([-3,-2,2,3])
-            self.enemies.append([Rect(x-16,y-16,32,32), vx, vy])
+            self.enemies.append([Rect(x-ew//2,y-eh//2,ew,eh), vx, vy])
 
     # saves
     def slot_filename(self, slot_index):
@@ -168,6 +365,9 @@ class Engine:
     def read_slot(self, slot_index):
         path=self.slot_filename(slot_index)
         try:
+            raw=self.save_writer.pending(path)
+            if raw is not None:
+                return json.loads(raw.decode("utf-8"))
             if os.path.exists(path):
                 with open(path,"r",encoding="utf-8") as f:
                     return json.load(f)
@@ -176,35 +376,202 @@ class Engine:
         return None
 
     def write_slot(self, slot_index, data):
+        # serialise here (a snapshot of data); the SaveWriter thread does the disk I/O
         path=self.slot_filename(slot_index)
         try:
-            with open(path,"w",encoding="utf-8") as f:
-                json.dump(data,f)
+            raw=json.dumps(data).encode("utf-8")
+            self.save_writer.submit(path, raw)
+            self.slot_index.record(slot_index, data, raw, path, pending=True)
             return True
         except Exception as e:
             print("[save] failed:", e)
             return False
 
-    def list_slots(self):
-        slots=[]
-        for i in range(1, self.SLOT_COUNT+1):
-            info={"index":i,"exists":False,"stage":None,"unlocked":[1],"timestamp":None}
-            d=self.read_slot(i)
-            if d:
-                info["exists"]=True
-                info["stage"]=int(d.get("stage",1))
-                info["unlocked"]=list(set(int(x) for x in d.get("unlocked",[1])))
-                info["timestamp"]=float(d.get("timestamp",0.0))
-            slots.append(info)
-        return slots
+    def slot_rows(self):
+        # slot indices the browser lists (saved, empty defaults, a free one to start/save in),
+        # filtered by slot_query; cached until the index, sort, query or mode changes
+        idx=self.slot_index
+        idx.refresh()
+        key=(idx.version, self.slot_sort, self.slot_query, self.slot_menu_mode)
+        if self._slot_rows[0] == key:
+            return self._slot_rows[1]
+        rows=list(idx.ordered(self.slot_sort))
+        rows += [i for i in range(1, self.SLOT_COUNT+1) if i not in idx.entries]
+        if self.slot_menu_mode in ("new","save"):
+            free=idx.next_free()
+            if free not in rows: rows.append(free)
+        q=self.slot_query.strip().lower()
+        if q:
+            rows=[i for i in rows if q in ui.slot_label(self.slot_info(i)).lower()]
+        self._slot_rows=(key, rows)
+        return rows
+
+    def slot_info(self, i):
+        info={"index":i,"exists":False,"stage":None,"unlocked":[1],"timestamp":None}
+        e=self.slot_index.entries.get(i)
+        if e:
+            info["exists"]=True
+            info["stage"]=e["stage"]
+            info["unlocked"]=list(e["unlocked"])
+            info["timestamp"]=e["timestamp"]
+        return info
+
+    def list_slots(self, indices=None):
+        # served from the slot index; no slot file is opened here
+        self.slot_index.refresh()
+        return [self.slot_info(i) for i in (indices if indices is not None else range(1, self.SLOT_COUNT+1))]
 
     def most_recent_slot_index(self):
-        slots=self.list_slots(); recent=None; recent_ts=0.0
-        for s in slots:
-            if s["exists"] and s["timestamp"]:
-                if s["timestamp"] > recent_ts:
-                    recent_ts = s["timestamp"]; recent = s["index"]
-        return recent
+        return self.slot_index.most_recent()
+
+    # ---------- save thumbnails (see thumbs.py) ----------
+    def thumbnail_filename(self, slot_index):
+        return os.path.join(SAVES_DIR, f"save_slot{slot_index}.png")
+
+    def grab_world_shot(self):
+        # one copy of the world area as currently shown on screen
+        world = Rect((self.window_w - self.world_w)//2, (self.window_h - self.world_h)//2, self.world_w, self.world_h)
+        world = world.clip(self.screen.get_rect())
+        if not world.width or not world.height: return None
+        return self.screen.subsurface(world).copy()
+
+    def save_thumbnail(self, slot_index, shot):
+        # no shot (a save before the current game was shown): drop the old picture
+        self.thumbnailer.submit(shot, self.thumbnail_filename(slot_index))
+
+    def slot_thumbnail(self, slot_index):
+        # decoded lazily for visible rows only; bounded by thumb_cache
+        e = self.slot_index.entries.get(slot_index)
+        if not e: return None
+        path = self.thumbnail_filename(slot_index)
+        if self.thumbnailer.jobs.unfinished_tasks:
+            return None  # a new thumbnail may still be on its way
+        def load():
+            try:
+                raw = self.save_writer.pending(path)
+                f = io.BytesIO(raw) if raw is not None else path
+                return pygame.image.load(f, "thumb.png").convert()
+            except Exception:
+                return None
+        return self.thumb_cache.get((slot_index, e["checksum"]), load)
+
+    # ---------- autosave journal (see journal.py) ----------
+    def journal_filename(self, slot_index):
+        return os.path.join(SAVES_DIR, f"save_slot{slot_index}.log")
+
+    def progress_data(self):
+        # slot file contents: the JSON save format plus money and shop upgrades
+        return {
+            "stage": int(self.stage), "unlocked": list(range(1, min(self.stage+1, self.MAX_STAGES)+1)),
+            "timestamp": time.time(), "money": int(self.money), "shield": bool(getattr(self,'shield',False)),
+            "player_speed_multiplier": getattr(self,'player_speed_multiplier',1.0),
+            "enemy_speed_multiplier": getattr(self,'enemy_speed_multiplier',1.0),
+        }
+
+    def apply_progress(self, data):
+        self.stage = int(data.get("stage",1))
+        self.money = int(data.get("money",0))
+        self.shield = bool(data.get("shield",False))
+        self.player_speed_multiplier = float(data.get("player_speed_multiplier",1.0))
+        self.enemy_speed_multiplier = float(data.get("enemy_speed_multiplier",1.0))
+
+    def begin_autosave(self, slot_index, seq=0):
+        if self.journal is not None: self.journal.close()
+        self.active_slot = slot_index
+        if slot_index:
+            with self.slot_index.own_change():  # may create the log
+                self.journal = SlotJournal(self.journal_filename(slot_index), seq)
+        else:
+            self.journal = None
+
+    def autosave_event(self, ev, **fields):
+        if self.journal is None: return
+        self.journal.append(ev, **fields)
+        if ev == "clear" or self.journal.needs_compaction():
+            self.compact_autosave()
+
+    def compact_autosave(self):
+        if self.journal is None: return
+        data = self.progress_data(); data["journal_seq"] = self.journal.seq
+        if self.write_slot(self.active_slot, data):
+            self.journal.compacted(self.journal.seq)
+            if not self.paused:
+                self.save_thumbnail(self.active_slot, self.grab_world_shot())
+
+    def autosave_tick(self):
+        # once per frame: slot index write, periodic journal flush, log truncation after compaction lands
+        self.slot_index.flush()
+        if self.journal is None: return
+        # a failed write never counts as landed: the log keeps its records
+        landed = self.save_writer.written(self.slot_filename(self.active_slot))
+        if self.journal.rewrite_due(landed):
+            with self.slot_index.own_change(): self.journal.tick(landed)
+        else:
+            self.journal.tick(landed)
+
+    def replay_journal(self, records):
+        for rec in records:
+            ev = rec.get("ev")
+            if ev == "clear":
+                self.stage = max(self.stage, int(rec["stage"]))
+            elif ev == "buy":
+                self.apply_shop_effect(rec["item"]); self.money = int(rec["money"])
+            elif ev == "money":
+                self.money = int(rec["money"])
+
+    # ---------- quicksave (binary snapshot, see snapshot.py) ----------
+    def quicksave_path(self):
+        return os.path.join(SAVES_DIR, "quicksave.bin")
+
+    def capture_state(self):
+        return {
+            "stage": int(self.stage), "money": int(self.money), "timestamp": time.time(),
+            "shot_available": self.shot_available, "shield": getattr(self,'shield',False),
+            "player_speed_multiplier": getattr(self,'player_speed_multiplier',1.0),
+            "enemy_speed_multiplier": getattr(self,'enemy_speed_multiplier',1.0),
+            "unlocked": list(range(1, min(self.stage+1, self.MAX_STAGES)+1)),
+            "player": self.player, "projectile": self.projectile, "projectile_v": self.projectile_v,
+            "arrow_end": self.arrow_end, "world_w": self.world_w, "world_h": self.world_h,
+            "enemies": self.enemies, "collectibles": self.collectibles,
+        }
+
+    def restore_state(self, state):
+        self.stage = int(state["stage"])
+        self.money = int(state["money"])
+        self.shot_available = state["shot_available"]
+        self.shield = state["shield"]
+        self.player_speed_multiplier = state["player_speed_multiplier"]
+        self.enemy_speed_multiplier = state["enemy_speed_multiplier"]
+        if state["enemies"] is None:
+            self.reset_stage(); return  # migrated JSON save: no world stored
+        self.stages_config = self.load_stages_config()
+        self.world_w, self.world_h = state["world_w"], state["world_h"]
+        self.player = Rect(state["player"])
+        self.enemies = [[Rect(r), vx, vy] for r,vx,vy in state["enemies"]]
+        self.collectibles = list(map(Rect, state["collectibles"]))
+        self.projectile = Rect(state["projectile"]) if state["projectile"] else None
+        self.projectile_v = state["projectile_v"]
+        self.arrow_end = state["arrow_end"]
+        self.just_reset = True
+
+    def quicksave(self):
+        raw = snapshot.encode(self.capture_state())
+        self.save_writer.submit(self.quicksave_path(), raw)
+        print(f"[save] quicksave stage {self.stage} ({len(raw)} bytes)")
+
+    def quickload(self, path=None):
+        # path may also be a JSON slot file; it is migrated by snapshot.decode
+        path = path or self.quicksave_path()
+        try:
+            raw = self.save_writer.pending(path)
+            if raw is None:
+                with open(path,"rb") as f: raw = f.read()
+            state = snapshot.decode(raw)
+        except Exception as e:
+            print("[load] quickload failed:", e); return False
+        self.restore_state(state); self.world_shot = None
+        print(f"[load] quickload stage {self.stage}")
+        return True
 
     # ---------- projectile / gameplay ----------
     def fire_projectile(self, tx, ty):
@@ -213,7 +580,8 @@ class Engine:
         angle = math.atan2(ty-cy, tx-cx)
         speed = 14.0
         vx = math.cos(angle)*speed; vy = math.sin(angle)*speed
-        self.projectile = Rect(cx-5, cy-5, 10,10)
+        pw,ph = self.SPRITE_SIZES["proj"]
+        self.projectile = Rect(cx-pw//2, cy-ph//2, pw,ph)
         self.projectile_v = (vx, vy)
         self.shot_available = False
         snd = self.assets.get("shoot")
@@ -240,12 +608,35 @@ class Engine:
                     except Exception: pass
                 break
 
+    @traced("frame")
     def update(self, dt):
-        # menus / title halt the world update
-        if self.on_title or self.on_front_menu or self.on_slot_menu or self.on_stage_select or self.in_menu or self.in_options:
-            return
-        if self.paused: return
+        # only the top scene runs; menus and the title halt the world
+        self.gc_policy.set_gameplay(not self.paused)
+        self.scenes.update(dt)
+
+    def handle_events(self, events):
+        for action,ev in self.controls.translate(events):
+            self.handle_action(action, ev)
+
+    def handle_action(self, action, ev=None):
+        # the top scene gets the action first; quit and reload work everywhere
+        if self.scenes.handle_action(action, ev): return True
+        if action == "quit":
+            self.quit_game()
+        elif action == "reload":
+            print("[engine] reload assets"); self.reload_assets()
+        elif action == "aim":
+            self.aim(ev.pos)
+        elif action == "perf":
+            print("[perf] overlay", "on" if self.perf.toggle() else "off")
+        elif action == "trace_dump":
+            if TRACER.enabled: TRACER.dump()
+            else: print("[trace] not recording (start with --trace or PHOBICS_TRACE=1)")
+        else:
+            return False
+        return True
 
+    def update_world(self, dt):
         keys = pygame.key.get_pressed()
         speed = 250 * dt
         dx = (keys[pygame.K_d] - keys[pygame.K_a]) * speed
@@ -259,8 +650,10 @@ class Engine:
             r.x += vx; r.y += vy
             if r.left <= 0 or r.right >= self.world_w: ent[1] = -vx
             if r.top <= 0 or r.bottom >= self.world_h: ent[2] = -vy
+        self.perf.lap("movement")
 
         self.move_projectile()
+        self.perf.lap("projectile")
         for c in list(self.collectibles):
             if self.player.colliderect(c):
                 try: self.collectibles.remove(c)
@@ -268,6 +661,7 @@ class Engine:
                 # Collectible gives $1
                 try:
                     self.money += 1
+                    self.autosave_event("money", money=self.money)
                 except Exception:
                     pass
                 snd=self.assets.get("collect_snd")
@@ -277,238 +671,176 @@ class Engine:
 
         for ent in list(self.enemies):
             r=ent[0]
-            if self.player.colliderect(r):
-                self.restart_stage(); return
+            if self.player.colliderect(r) and self.stress is None:
+                self.restart_stage(); self.perf.lap("collisions"); return
 
         if not self.collectibles and not getattr(self, 'just_reset', False):
             # Open shop every 3 completed stages (3,6,9...) before advancing
             if self.stage < self.MAX_STAGES and (self.stage % 3) == 0:
-                self.in_shop = True
-                self.paused = True
-                self.build_shop_buttons()
+                self.open_shop()
             else:
                 if self.stage < self.MAX_STAGES: self.stage += 1
+                self.autosave_event("clear", stage=self.stage)
                 self.reset_stage()
 
         # clear the just_reset flag after one update frame
         if getattr(self, 'just_reset', False):
             self.just_reset = False
 
-        mx,my = pygame.mouse.get_pos()
-        wx = mx - (self.window_w - self.world_w)//2
-        wy = my - (self.window_h - self.world_h)//2
+        wx,wy = self.aim_world
         cx,cy = self.player.center
         angle = math.atan2(wy-cy, wx-cx)
-        length = 18
+        length = self.SPRITE_SIZES["arrow"][0]
         self.arrow_end = (cx + math.cos(angle)*length, cy + math.sin(angle)*length)
+        self.perf.lap("collisions")
 
     # ---------- drawing ----------
+    @traced("frame")
     def draw(self):
+        # the top scene and any scenes it shows through to, then the perf overlay
+        self.surfaces.recycle()  # last frame's scratch surfaces are free again
+        self.scenes.draw(self.screen)
+        self.perf.lap("overlays")  # menus/shop; draw_world and draw_hud lap their own phases first
+        if self.perf.show:
+            self.perf_overlay.draw(self.screen)
+            self.perf.lap("perf")
+
+    def draw_hud(self):
+        # part of the Gameplay layer: frozen with it under the shop, never over a panel
+        self.hud.draw(self.screen)
+        self.perf.lap("hud")
+
+    def draw_title_screen(self):
         # Title fade and prompt
-        if self.on_title:
-            elapsed = time.time() - self.title_start_time
-            t = min(1.0, elapsed / max(0.0001, self.title_fade_in_time))
-            self.title_alpha = int(255 * (t))
-            if t >= 1.0:
-                self.title_prompt_visible = True
-                self.title_prompt_time = time.time()
-            self.draw_title()
-            if self.title_prompt_visible:
-                small = pygame.font.SysFont(None, 24)
-                prompt = small.render("Press any key to continue", True, (230,230,230))
-                pr = prompt.get_rect(center=(self.window_w//2, int(self.window_h*0.88)))
-                self.screen.blit(prompt, pr)
-            return
-
-        is_menu = (self.on_front_menu or self.on_slot_menu or self.in_menu or self.in_options or self.on_stage_select)
-        if is_menu:
-            self.draw_title()
-
-        if not is_menu:
-            # simplified world rendering (keeps your look)
-            base = pygame.Surface((self.window_w, self.window_h))
-            base.fill((28,28,28))
-            for i in range(200):
-                x=random.randrange(0,self.window_w); y=random.randrange(0,self.window_h)
-                a=random.randint(8,22); base.fill((40,40,40,a),(x,y,1,1))
-            small = pygame.transform.smoothscale(base,(max(1,self.window_w//20), max(1,self.window_h//20)))
-            blurred = pygame.transform.smoothscale(small, (self.window_w, self.window_h))
-            self.screen.blit(blurred,(0,0))
-
-            offset_x = (self.window_w - self.world_w)//2
-            offset_y = (self.window_h - self.world_h)//2
-
-            vign = pygame.Surface((self.window_w, self.window_h), pygame.SRCALPHA)
-            vign.fill((0,0,0,90))
-            pygame.draw.rect(vign, (0,0,0,0), (offset_x+3, offset_y+3, self.world_w-6, self.world_h-6))
-            self.screen.blit(vign,(0,0))
-
-            world_bg = pygame.Surface((self.world_w, self.world_h))
-            world_bg.fill((10,10,10))
-            self.screen.blit(world_bg,(offset_x, offset_y))
-
-            pygame.draw.rect(self.screen, (200,200,200), (offset_x, offset_y, self.world_w, self.world_h), 3)
-
-            for c in self.collectibles:
-                pygame.draw.ellipse(self.screen, (180,140,60), (c.x+offset_x, c.y+offset_y, c.width, c.height))
-
-            for ent in self.enemies:
-                r=ent[0]; img=self.assets.get("enemy")
-                if isinstance(img, pygame.Surface):
-                    surf = pygame.transform.smoothscale(img, (r.width, r.height)); self.screen.blit(surf,(r.x+offset_x, r.y+offset_y))
-                else:
-                    pygame.draw.rect(self.screen, (180,40,40), (r.x+offset_x, r.y+offset_y, r.width, r.height))
-
-            if self.projectile:
-                p=self.projectile; img=self.assets.get("proj")
-                if isinstance(img, pygame.Surface):
-                    surf = pygame.transform.smoothscale(img, (p.width, p.height)); self.screen.blit(surf,(p.x+offset_x,p.y+offset_y))
-                else:
-                    pygame.draw.ellipse(self.screen, (0,200,200), (p.x+offset_x,p.y+offset_y,p.width,p.height))
-
-            pimg = self.assets.get("player")
-            if isinstance(pimg, pygame.Surface):
-                surf = pygame.transform.smoothscale(pimg, (self.player.width, self.player.height)); self.screen.blit(surf,(self.player.x+offset_x,self.player.y+offset_y))
-            else:
-                pygame.draw.rect(self.screen, (230,230,230), (self.player.x+offset_x, self.player.y+offset_y, self.player.width, self.player.height))
-
-            cx,cy = self.player.center; ax,ay = self.arrow_end
-            pygame.draw.line(self.screen, (0,200,200), (cx+offset_x, cy+offset_y), (ax+offset_x, ay+offset_y), 3)
-
-            font = pygame.font.SysFont(None, 24)
-            text = font.render(f"Stage: {self.stage}", True, (240,240,240)); self.screen.blit(text,(8,8))
-            shot_text = "Shot: READY" if self.shot_available else "Shot: USED"
-            st = font.render(shot_text, True, (200,200,200)); self.screen.blit(st,(8,32))
-
-            if self.paused and not self.in_menu and not self.in_options:
-                big = pygame.font.SysFont(None,64); p = big.render("PAUSED", True, (200,40,40))
-                pr = p.get_rect(center=(self.window_w//2, 40)); self.screen.blit(p, pr)
-
-            # CRT
-            crt = pygame.Surface((self.window_w, self.window_h), pygame.SRCALPHA)
-            for y in range(0, self.window_h, 2):
-                pygame.draw.line(crt, (0,0,0,40), (0,y), (self.window_w,y))
-            tint = pygame.Surface((self.window_w, self.window_h), pygame.SRCALPHA); tint.fill((5,0,0,20)); self.screen.blit(tint, (-1,0))
-            tint2 = pygame.Surface((self.window_w, self.window_h), pygame.SRCALPHA); tint2.fill((0,0,5,20)); self.screen.blit(tint2, (1,0))
-            self.screen.blit(crt,(0,0))
-
-
-        # --- Shop UI (between stages) ---
-        if self.in_shop:
-            overlay = pygame.Surface((self.window_w, self.window_h), pygame.SRCALPHA)
-            overlay.fill((0,0,0,220))
-            self.screen.blit(overlay, (0,0))
-            if getattr(self,'shop_bg',None) is not None:
-                bg=self.shop_bg; bw,bh = bg.get_size(); scale = min(self.window_w/bw, self.window_h/bh)
-                nw,nh = int(bw*scale), int(bh*scale)
-                bg_s = pygame.transform.smoothscale(bg,(nw,nh)); x=(self.window_w-nw)//2; y=(self.window_h-nh)//2; self.screen.blit(bg_s,(x,y))
-            font_s = pygame.font.SysFont(None,44)
-            title = font_s.render('BACK-ALLEY VENDOR', True, self.color_schemes[self.theme]['text'])
-            tr = title.get_rect(center=(self.window_w//2, int(self.window_h*0.12)))
-            self.screen.blit(title,tr)
-            small = pygame.font.SysFont(None,20)
-            desc = small.render('Deals are scarce. Spend your dollars wisely.', True, self.color_schemes[self.theme]['muted'])
-            dr = desc.get_rect(center=(self.window_w//2, int(self.window_h*0.18)))
-            self.screen.blit(desc, dr)
-            font_item = pygame.font.SysFont(None,28)
-            sx = (self.window_w - 720)//2
-            sy = int(self.window_h*0.24)
-            for i,item in enumerate(self.shop_items):
-                rx = sx + (i%2)*360
-                ry = sy + (i//2)*110
-                rect = Rect(rx, ry, 340, 90)
-                pygame.draw.rect(self.screen, self.color_schemes[self.theme]['ui_bg'], rect)
-                pygame.draw.rect(self.screen, (160,160,160), rect, 2)
-                name = font_item.render(item['name'], True, self.color_schemes[self.theme]['text'])
-                price = font_item.render(f"${item['price']}", True, (200,200,120))
-                self.screen.blit(name, (rect.x + 12, rect.y + 8))
-                self.screen.blit(price, (rect.x + rect.width - price.get_width() - 12, rect.y + 8))
-                desc = pygame.font.SysFont(None,18).render(item.get('desc',''), True, self.color_schemes[self.theme]['muted'])
-                self.screen.blit(desc, (rect.x + 12, rect.y + 40))
-                if len(self.shop_buttons) <= i:
-                    self.shop_buttons.append((rect, item['id'], item['price']))
-            bx = (self.window_w - 260)//2; by = sy + 3*110
-            back_rect = Rect(bx, by, 260, 48)
-            pygame.draw.rect(self.screen, (70,70,70), back_rect); pygame.draw.rect(self.screen, (190,190,190), back_rect, 2)
-            btxt = pygame.font.SysFont(None,30).render('Leave', True, self.color_schemes[self.theme]['text'])
-            self.screen.blit(btxt, (back_rect.x + 80, back_rect.y + 10))
-            money_txt = pygame.font.SysFont(None,24).render(f"Money: ${self.money}", True, self.color_schemes[self.theme]['text'])
-            self.screen.blit(money_txt, (12, self.window_h - 32))
-        # Menus: draw overlays and buttons (kept minimal; actions are wired in main)
-        if self.in_menu:
-            overlay = pygame.Surface((self.window_w, self.window_h), pygame.SRCALPHA); overlay.fill((0,0,0,140)); self.screen.blit(overlay,(0,0))
-            fontm = pygame.font.SysFont(None,24)
-            for rect,label,_ in self.menu_buttons:
-                pygame.draw.rect(self.screen, (60,60,60), rect); pygame.draw.rect(self.screen, (180,180,180), rect,2)
-                lbl = fontm.render(label, True, (240,240,240)); self.screen.blit(lbl, (rect.x+12, rect.y+8))
-
-        if self.in_options:
-            overlay = pygame.Surface((self.window_w, self.window_h), pygame.SRCALPHA); overlay.fill((0,0,0,180)); self.screen.blit(overlay,(0,0))
-            fonto = pygame.font.SysFont(None,22)
-            for rect,label,_ in self.options_buttons:
-                pygame.draw.rect(self.screen, (50,50,50), rect); pygame.draw.rect(self.screen,(200,200,200),rect,2)
-                lbl = fonto.render(label, True, (240,240,240)); self.screen.blit(lbl,(rect.x+8,rect.y+6))
-
-        if self.on_front_menu:
-            overlay = pygame.Surface((self.window_w, self.window_h), pygame.SRCALPHA); overlay.fill((0,0,0,180)); self.screen.blit(overlay,(0,0))
-            font = pygame.font.SysFont(None,36)
-            title = pygame.font.SysFont(None,80).render("PHOBICS", True, (230,230,230)); tr = title.get_rect(center=(self.window_w//2, self.window_h//4)); self.screen.blit(title,tr)
-            for rect,label,_ in self.front_menu_buttons:
-                pygame.draw.rect(self.screen,(60,60,60),rect); pygame.draw.rect(self.screen,(180,180,180),rect,2)
-                txt = font.render(label, True, (240,240,240)); self.screen.blit(txt,(rect.x+14, rect.y+8))
-
-        if self.on_slot_menu:
-            overlay = pygame.Surface((self.window_w, self.window_h), pygame.SRCALPHA); overlay.fill((0,0,0,200)); self.screen.blit(overlay,(0,0))
-            font = pygame.font.SysFont(None,32)
-            title_txt = "Choose Slot"
-            if self.slot_menu_mode == "new": title_txt = "Choose Slot to Start New Game"
-            elif self.slot_menu_mode == "load": title_txt = "Choose Slot to Load"
-            elif self.slot_menu_mode == "save": title_txt = "Choose Slot to Save Current Progress"
-            title = pygame.font.SysFont(None,64).render(title_txt, True, (230,230,230)); tr = title.get_rect(center=(self.window_w//2, self.window_h//6)); self.screen.blit(title,tr)
-            for rect,label,idx in self.slot_buttons:
-                pygame.draw.rect(self.screen,(50,50,50),rect); pygame.draw.rect(self.screen,(190,190,190),rect,2)
-                txt = font.render(label, True, (230,230,230)); self.screen.blit(txt,(rect.x+16, rect.y+12))
-
-        if self.on_stage_select:
-            overlay = pygame.Surface((self.window_w, self.window_h), pygame.SRCALPHA); overlay.fill((0,0,0,210)); self.screen.blit(overlay,(0,0))
-            title = pygame.font.SysFont(None,56).render("Select Stage", True, (230,230,230)); tr=title.get_rect(center=(self.window_w//2, self.window_h//8)); self.screen.blit(title,tr)
-            font = pygame.font.SysFont(None,28)
-            for rect,label,idx,sel in self.stage_buttons:
-                bg_col = (60,60,60) if sel else (35,35,35)
-                border_col = (200,200,200) if sel else (110,110,110)
-                txt_col = (240,240,240) if sel else (140,140,140)
-                pygame.draw.rect(self.screen, bg_col, rect); pygame.draw.rect(self.screen, border_col, rect,2)
-                txt = font.render(label, True, txt_col)
-                tx = rect.x + (rect.width - txt.get_width())//2; ty = rect.y + (rect.height - txt.get_height())//2
-                self.screen.blit(txt, (tx, ty))
+        elapsed = time.time() - self.title_start_time
+        t = min(1.0, elapsed / max(0.0001, self.title_fade_in_time))
+        self.title_alpha = int(255 * (t))
+        if t >= 1.0:
+            self.title_prompt_visible = True
+            self.title_prompt_time = time.time()
+        self.draw_title()
+        if self.title_prompt_visible:
+            prompt = self.title_text()[2]
+            pr = prompt.get_rect(center=(self.window_w//2, int(self.window_h*0.88)))
+            self.screen.blit(prompt, pr)
+
+    def draw_world(self):
+        # simplified world rendering (keeps your look); scratch surfaces come from the pool
+        pool = self.surfaces; size = (self.window_w, self.window_h)
+        base = pool.get(size)
+        base.fill((28,28,28))
+        for i in range(200):
+            x=random.randrange(0,self.window_w); y=random.randrange(0,self.window_h)
+            a=random.randint(8,22); base.fill((40,40,40,a),(x,y,1,1))
+        small_size = (max(1,self.window_w//20), max(1,self.window_h//20))
+        small = pygame.transform.smoothscale(base, small_size, pool.get(small_size))
+        blurred = pygame.transform.smoothscale(small, size, pool.get(size))
+        self.screen.blit(blurred,(0,0))
+        self.perf.lap("backdrop")
+
+        offset_x = (self.window_w - self.world_w)//2
+        offset_y = (self.window_h - self.world_h)//2
+
+        vign = pool.get(size, pygame.SRCALPHA)
+        vign.fill((0,0,0,90))
+        pygame.draw.rect(vign, (0,0,0,0), (offset_x+3, offset_y+3, self.world_w-6, self.world_h-6))
+        self.screen.blit(vign,(0,0))
+
+        self.screen.fill((10,10,10), (offset_x, offset_y, self.world_w, self.world_h))
+
+        pygame.draw.rect(self.screen, (200,200,200), (offset_x, offset_y, self.world_w, self.world_h), 3)
+        self.perf.lap("vignette")
+
+        atlas = self.ensure_atlas()
+        stamp = atlas.get("stamp:collect")
+        self.screen.blits([(stamp, (c.x+offset_x, c.y+offset_y)) for c in self.collectibles], doreturn=False)
+
+        rects = [ent[0] for ent in self.enemies]
+        if not self.blit_sprites("enemy", rects, offset_x, offset_y):
+            for r in rects:
+                pygame.draw.rect(self.screen, (180,40,40), (r.x+offset_x, r.y+offset_y, r.width, r.height))
+
+        if self.projectile:
+            p=self.projectile
+            if not self.blit_sprite("proj", p, offset_x, offset_y):
+                pygame.draw.ellipse(self.screen, (0,200,200), (p.x+offset_x,p.y+offset_y,p.width,p.height))
+
+        if not self.blit_sprite("player", self.player, offset_x, offset_y):
+            pygame.draw.rect(self.screen, (230,230,230), (self.player.x+offset_x, self.player.y+offset_y, self.player.width, self.player.height))
+
+        cx,cy = self.player.center; ax,ay = self.arrow_end
+        step = round(math.atan2(ay-cy, ax-cx) / (2*math.pi) * self.ARROW_STEPS) % self.ARROW_STEPS
+        arrow = atlas.get(f"stamp:arrow:{step}")
+        self.screen.blit(arrow, arrow.get_rect(center=(cx+offset_x, cy+offset_y)))
+        self.perf.lap("entities")
+
+        # CRT
+        crt = pool.get(size, pygame.SRCALPHA); crt.fill((0,0,0,0))
+        for y in range(0, self.window_h, 2):
+            pygame.draw.line(crt, (0,0,0,40), (0,y), (self.window_w,y))
+        tint = pool.get(size, pygame.SRCALPHA); tint.fill((5,0,0,20)); self.screen.blit(tint, (-1,0))
+        tint2 = pool.get(size, pygame.SRCALPHA); tint2.fill((0,0,5,20)); self.screen.blit(tint2, (1,0))
+        self.screen.blit(crt,(0,0))
+        self.perf.lap("crt")
+
+    def draw_shop(self):
+        # --- Shop UI (between stages), over the frozen world frame ---
+        self._shop_money.set_text(f"Money: ${self.money}")  # re-rendered only when it changes
+        self.shop_ui.draw(self.screen)
+
+    # Menus: animated title background plus one cached panel (see widgets.py)
+    def draw_pause_menu(self):
+        self.draw_title(); self.menu_ui.draw(self.screen)
+
+    def draw_options(self):
+        self.draw_title(); self.options_ui.draw(self.screen)
+
+    def draw_front_menu(self):
+        self.draw_title(); self.front_menu_ui.draw(self.screen)
+
+    def draw_slot_menu(self):
+        self.draw_title()
+        for idx,img in self._slot_thumbs:
+            img.set_image(self.slot_thumbnail(idx))
+        self.slot_ui.draw(self.screen)
+
+    def draw_stage_select(self):
+        self.draw_title(); self.stage_ui.draw(self.screen)
 
     # ---------- title drawing ----------
+    def title_text(self):
+        # the title screen's fixed strings, rendered once
+        if self._title_text is None:
+            self._title_text = (widgets.font(96).render("PHOBICS", True, (220,220,220)),
+                                widgets.font(24).render("a bleak, short game", True, (180,180,180)),
+                                widgets.font(24).render("Press any key to continue", True, (230,230,230)))
+        return self._title_text
+
     def draw_title(self):
-        big = pygame.font.SysFont(None,96)
-        title_surf = big.render("PHOBICS", True, (220,220,220))
+        title_surf,sub,_ = self.title_text()
         try:
             title_surf.set_alpha(int(self.title_alpha))
         except Exception:
             pass
         title_rect = title_surf.get_rect(center=(self.window_w//2, self.window_h//2 - 40))
         # background noise
-        bg = pygame.Surface((self.window_w, self.window_h))
+        size = (self.window_w, self.window_h)
+        bg = self.surfaces.get(size)
         flicker = random.randint(-8,8)
         gray = max(0, min(25 + flicker, 255)); bg.fill((gray,gray,gray))
         for _ in range(400):
             x=random.randrange(0,self.window_w); y=random.randrange(0,self.window_h); c=random.randint(0,40); bg.set_at((x,y),(c,c,c))
         self.screen.blit(bg,(0,0))
         # subtle vignette
-        vign = pygame.Surface((self.window_w, self.window_h), pygame.SRCALPHA)
+        vign = self.surfaces.get(size, pygame.SRCALPHA); vign.fill((0,0,0,0))
         pygame.draw.rect(vign, (0,0,0,150), (30,30,self.window_w-60, self.window_h-60))
         pygame.draw.rect(vign, (0,0,0,0), (70,70,self.window_w-140, self.window_h-140))
         self.screen.blit(vign,(0,0))
         self.screen.blit(title_surf, title_rect)
-        small = pygame.font.SysFont(None,24)
-        sub = small.render("a bleak, short game", True, (180,180,180))
         self.screen.blit(sub, (title_rect.centerx - sub.get_width()//2, title_rect.bottom + 6))
 
     # ---------- audio ----------
+    @traced("audio")
     def play_title_music(self):
         try:
             if os.path.exists(self.title_music):
@@ -519,6 +851,7 @@ class Engine:
         except Exception as e:
             print("[music] couldn't play title music:", e)
 
+    @traced("audio")
     def play_game_music(self):
         try:
             if os.path.exists(self.game_music):
@@ -537,13 +870,44 @@ class Engine:
 
     # ---------- menu actions (light wrappers) ----------
     def open_menu(self):
-        self.paused=True; self.in_menu=True; self.menu_buttons=ui.build_menu_buttons(self.window_w, self.window_h)
+        if not self.paused: self.world_shot = self.grab_world_shot()  # screen still shows gameplay
+        self.scenes.push(scenes.PauseMenu(self))
 
     def close_menu(self):
-        self.in_menu=False; self.paused=False; self.menu_buttons=[]
+        if isinstance(self.scenes.top, scenes.PauseMenu): self.scenes.pop()
+
+    def open_shop(self):
+        self.scenes.push(scenes.Shop(self))
+
+    def build_menu(self):
+        self.menu_ui = widgets.Panel((self.window_w, self.window_h), (0,0,0,140))
+        self.menu_ui.add_buttons(ui.build_menu_buttons(self.window_w, self.window_h), ui.MENU_STYLE)
+
+    def build_options_menu(self):
+        self.options_ui = widgets.Panel((self.window_w, self.window_h), (0,0,0,180))
+        self.options_ui.add_buttons(ui.build_options_buttons(self.window_w, self.window_h), ui.OPTIONS_STYLE)
 
     def build_shop_buttons(self):
-        self.shop_buttons = []
+        colors = self.color_schemes[self.theme]
+        panel = widgets.Panel((self.window_w, self.window_h), (0,0,0,220))
+        if getattr(self,'shop_bg',None) is not None:
+            bg=self.shop_bg; bw,bh = bg.get_size(); scale = min(self.window_w/bw, self.window_h/bh)
+            nw,nh = int(bw*scale), int(bh*scale)
+            panel.add(widgets.Image(pygame.transform.smoothscale(bg,(nw,nh)), center=(self.window_w//2, self.window_h//2)))
+        panel.add(widgets.Label('BACK-ALLEY VENDOR', 44, colors['text'], center=(self.window_w//2, int(self.window_h*0.12))))
+        panel.add(widgets.Label('Deals are scarce. Spend your dollars wisely.', 20, colors['muted'], center=(self.window_w//2, int(self.window_h*0.18))))
+        item_style = widgets.ButtonStyle(28, normal=(colors['ui_bg'],(160,160,160),colors['text']), hover=(colors['ui_bg'],(230,230,230),colors['text']))
+        sx = (self.window_w - 720)//2
+        sy = int(self.window_h*0.24)
+        for i,item in enumerate(self.shop_items):
+            rect = Rect(sx + (i%2)*360, sy + (i//2)*110, 340, 90)
+            panel.add(widgets.Button(rect, item['name'], item['id'], item_style))
+            panel.add(widgets.Label(f"${item['price']}", 28, (200,200,120), topright=(rect.right - 12, rect.y + 8)))
+            panel.add(widgets.Label(item.get('desc',''), 18, colors['muted'], topleft=(rect.x + 12, rect.y + 40)))
+        leave_style = widgets.ButtonStyle(30, (80,10), normal=((70,70,70),(190,190,190),colors['text']), hover=((90,90,90),(230,230,230),colors['text']))
+        panel.add(widgets.Button(Rect((self.window_w - 260)//2, sy + 3*110, 260, 48), 'Leave', 'leave', leave_style))
+        self._shop_money = panel.add(widgets.Label(f"Money: ${self.money}", 24, colors['text'], topleft=(12, self.window_h - 32)))
+        self.shop_ui = panel
 
     def apply_shop_item(self, item_id):
         item = next((it for it in self.shop_items if it['id']==item_id), None)
@@ -551,6 +915,11 @@ class Engine:
         price = item.get('price', 0)
         if self.money < price: return False
         self.money -= price
+        self.apply_shop_effect(item_id)
+        self.autosave_event("buy", item=item_id, money=self.money)
+        return True
+
+    def apply_shop_effect(self, item_id):
         if item_id == 'shot_capacity':
             self.shot_available = True
         elif item_id == 'move_speed':
@@ -561,50 +930,85 @@ class Engine:
             self.enemy_speed_multiplier = max(0.4, getattr(self,'enemy_speed_multiplier',1.0) * 0.8)
         elif item_id == 'extra_money':
             self.money += 5
-        return True
 
     def close_shop(self):
-        self.in_shop = False
-        self.paused = False
+        if isinstance(self.scenes.top, scenes.Shop): self.scenes.pop()
         self.stage = min(self.MAX_STAGES, self.stage + 1)
+        self.autosave_event("clear", stage=self.stage)
         self.reset_stage()
 
     def open_options(self):
-        self.menu_buttons=[]; self.in_menu=False; self.in_options=True; self.paused=True; self.options_buttons=ui.build_options_buttons(self.window_w, self.window_h)
+        self.scenes.push(scenes.Options(self))
 
     def close_options(self):
-        self.in_options=False; self.open_menu(); self.options_buttons=[]
+        if isinstance(self.scenes.top, scenes.Options): self.scenes.pop()
 
     def back_to_title(self):
-        self.on_title=True; self.on_front_menu=False; self.on_slot_menu=False; self.on_stage_select=False; self.in_menu=False; self.in_options=False; self.play_title_music(); self.title_start_time=time.time(); self.title_alpha=0.0; self.title_prompt_visible=False
+        self.world_shot = None
+        self.scenes.reset(scenes.Title(self)); self.play_title_music(); self.title_start_time=time.time(); self.title_alpha=0.0; self.title_prompt_visible=False
 
     def quit_game(self):
+        if self.watcher is not None: self.watcher.stop()
+        if self.journal is not None: self.journal.close()
+        self.thumbnailer.stop()
+        self.slot_index.flush()
+        self.save_writer.stop()  # flush pending saves
+        if self.flight is not None: self.flight.close()
+        if self.sampler is not None: self.sampler.stop()
+        self.gc_policy.close()
+        if TRACER.enabled: TRACER.dump()
         try: pygame.mixer.music.stop()
         except Exception: pass
         pygame.quit(); sys.exit()
 
     def open_new_game_slot_menu(self):
-        self.on_front_menu=False; self.on_slot_menu=True; self.slot_menu_mode="new"; self.selected_slot=None; self.build_slot_buttons()
+        self.scenes.push(scenes.SlotMenu(self, "new"))
 
     def open_load_slot_menu(self):
-        self.on_front_menu=False; self.on_slot_menu=True; self.slot_menu_mode="load"; self.selected_slot=None; self.build_slot_buttons()
+        self.scenes.push(scenes.SlotMenu(self, "load"))
 
     def open_save_slot_menu(self):
-        self.on_slot_menu=True; self.slot_menu_mode="save"; self.on_front_menu=False; self.selected_slot=None; self.build_slot_buttons()
+        self.scenes.push(scenes.SlotMenu(self, "save"))
+
+    def start_new_game(self, stage):
+        # a fresh game: no money or upgrades from the previous session, no thumbnail until played
+        self.apply_progress({"stage": stage}); self.world_shot = None
+        if self.selected_slot:
+            self.save_to_slot(self.selected_slot)
+        else:
+            self.begin_autosave(None)  # don't journal into the previous game's slot
+        print(f"[new] Created new game in slot {self.selected_slot} stage {self.stage}")
+        self.scenes.reset(scenes.Gameplay(self))
+        self.play_game_music(); self.reset_stage()
 
     def save_to_slot(self, slot_index):
-        data = {"stage": int(self.stage), "unlocked": list(range(1, min(self.stage+1, self.MAX_STAGES)+1)), "timestamp": time.time()}
+        if slot_index != self.active_slot:
+            if self.journal is not None: self.journal.close(); self.journal = None
+            try:
+                with self.slot_index.own_change(): os.remove(self.journal_filename(slot_index))  # records belong to the old save
+            except OSError: pass
+            self.begin_autosave(slot_index, 0)
+        data = self.progress_data(); data["journal_seq"] = self.journal.seq
         ok = self.write_slot(slot_index, data)
+        if ok:
+            self.journal.compacted(self.journal.seq)
+            self.save_thumbnail(slot_index, self.world_shot)
         if ok: print(f"[save] saved to slot {slot_index} stage {self.stage}")
         if self.slot_menu_mode == "save":
-            self.on_slot_menu=False; self.close_menu()
+            self.scenes.pop(); self.close_menu()
 
     def load_from_slot(self, slot_index):
         data = self.read_slot(slot_index)
         if not data: print(f"[load] empty"); return False
-        self.stage = int(data.get("stage",1))
+        self.apply_progress(data); self.world_shot = None
+        # recover autosaves made after the slot file was last compacted
+        seq = int(data.get("journal_seq",0))
+        records = SlotJournal.records(self.journal_filename(slot_index), seq)
+        self.replay_journal(records)
+        if records: seq = records[-1]["seq"]
+        self.begin_autosave(slot_index, seq)
         self.reset_stage()
-        self.on_slot_menu=False; self.on_stage_select=False; self.on_front_menu=False; self.in_menu=False; self.paused=False; self.play_game_music()
+        self.scenes.reset(scenes.Gameplay(self)); self.play_game_music()
         print(f"[load] loaded slot {slot_index} stage {self.stage}")
         return True
 
@@ -641,7 +1045,9 @@ class Engine:
         try:
             self.window_w, self.window_h = int(w), int(h)
             self.screen = pygame.display.set_mode((self.window_w, self.window_h))
+            self.surfaces.clear()
             self.world_w, self.world_h = self.world_size()
+            self.thumb_cache.resize(ui.slots_per_page(self.window_h))
             self.build_front_menu(); self.build_slot_buttons(); self.reset_stage()
         except Exception as e:
             print('[options] failed to set resolution', e)
@@ -650,23 +1056,58 @@ class Engine:
         self.theme = 'light' if self.theme == 'dark' else 'dark'
 
     def build_front_menu(self):
-        # produce button list and optionally populate actions in main (actions are bound in main)
-        self.front_menu_buttons = ui.build_front_menu(self.window_w, self.window_h)
-        try:
-            w,h = 300,48
-            sx=(self.window_w - w)//2; sy=(self.window_h - 240)//2
-            self.front_menu_buttons.append((Rect(sx, sy + 4*64, w, h), 'Options', self.open_options))
-        except Exception:
-            pass
+        # front menu panel; clicks are mapped to methods by label in scenes.FrontMenu
+        layout = ui.build_front_menu(self.window_w, self.window_h)
+        w,h = 300,48
+        sx=(self.window_w - w)//2; sy=(self.window_h - 240)//2
+        layout.append((Rect(sx, sy + 4*64, w, h), 'Options', self.open_options))
+        self.front_menu_ui = widgets.Panel((self.window_w, self.window_h), (0,0,0,180))
+        self.front_menu_ui.add(widgets.Label("PHOBICS", 80, (230,230,230), center=(self.window_w//2, self.window_h//4)))
+        self.front_menu_ui.add_buttons(layout, ui.FRONT_STYLE)
+
+    def slot_pages(self):
+        per = ui.slots_per_page(self.window_h)
+        return per, max(1, (len(self.slot_rows()) + per - 1)//per)
 
     def build_slot_buttons(self):
-        slots = self.list_slots()
-        self.slot_buttons = ui.build_slot_buttons(self.window_w, self.window_h, slots)
+        # only the visible page is turned into buttons
+        per,pages = self.slot_pages()
+        self.slot_page = max(0, min(self.slot_page, pages-1))
+        rows = self.slot_rows()[self.slot_page*per:(self.slot_page+1)*per]
+        slots = [self.slot_info(i) for i in rows]
+        panel = widgets.Panel((self.window_w, self.window_h), (0,0,0,200))
+        title_txt = "Choose Slot"
+        if self.slot_menu_mode == "new": title_txt = "Choose Slot to Start New Game"
+        elif self.slot_menu_mode == "load": title_txt = "Choose Slot to Load"
+        elif self.slot_menu_mode == "save": title_txt = "Choose Slot to Save Current Progress"
+        title = panel.add(widgets.Label(title_txt, 64, (230,230,230), center=(self.window_w//2, self.window_h//6)))
+        status = f"Page {self.slot_page+1}/{pages}   Search: {self.slot_query or '(type to filter)'}"
+        panel.add(widgets.Label(status, 24, (170,170,170), center=(self.window_w//2, title.rect.bottom + 18)))
+        buttons = panel.add_buttons(ui.build_slot_buttons(self.window_w, self.window_h, slots, self.slot_page, pages, self.slot_sort), ui.SLOT_STYLE)
+        self._slot_thumbs = [(b.action, panel.add(widgets.Image(midright=(b.rect.right-2, b.rect.centery))))
+                             for b in buttons if isinstance(b.action, int) and b.action > 0]
+        self.slot_ui = panel
+
+    def slot_menu_action(self, action):
+        if action == "prev": self.slot_page -= 1
+        elif action == "next": self.slot_page += 1
+        elif action == "sort":
+            self.slot_sort = "index" if self.slot_sort == "recent" else "recent"; self.slot_page = 0
+        self.build_slot_buttons()
+
+    def set_slot_query(self, query):
+        self.slot_query = query; self.slot_page = 0
+        self.build_slot_buttons()
+
+    def reset_slot_browser(self):
+        self.slot_page = 0; self.slot_query = ""
 
     def build_stage_buttons_for_slot(self, slot_index, mode="new"):
         unlocked = {1}
         if mode!="new":
-            data=self.read_slot(slot_index)
-            if data:
-                unlocked=set(int(x) for x in data.get("unlocked",[1]))
-        self.stage_buttons = ui.build_stage_buttons_for_slot(self.window_w, self.window_h, self.MAX_STAGES, unlocked)
+            e=self.slot_index.get(slot_index)
+            if e:
+                unlocked=set(e["unlocked"])
+        self.stage_ui = widgets.Panel((self.window_w, self.window_h), (0,0,0,210))
+        self.stage_ui.add(widgets.Label("Select Stage", 56, (230,230,230), center=(self.window_w//2, self.window_h//8)))
+        self.stage_ui.add_buttons(ui.build_stage_buttons_for_slot(self.window_w, self.window_h, self.MAX_STAGES, unlocked), ui.STAGE_STYLE)
@@ -0,0 +1,121 @@
+# phobics/flight.py
+# Flight recorder: the last CAPACITY frames of timing and game state in a
+# memory-mapped ring file (flight.ring). The mapping is shared, so the ring
+# survives a hard crash in the page cache; spikes and uncaught exceptions
+# also copy the ring to spike-*/crash-*.ring next to it. The previous
+# session's ring is kept as flight.prev.ring.
+#
+#   header  PHFR, version, record size, capacity, frames written (u64)
+#   record  _REC, slot = frame % capacity
+#
+# `python -m phobics.flight [file]` prints the recorded frames.
+import os
+import sys
+import mmap
+import time
+import struct
+
+from .settings import FLIGHT_DIR
+
+MAGIC = b"PHFR"
+VERSION = 1
+_HEAD = struct.Struct("<4sHHIQ")
+# frame, wall time, work ms, dt ms, gc ms, gc collections, stage, enemies, collectibles, scene
+_REC = struct.Struct("<QdfffHHIIB3x")
+# scene ids stored in records (class names from scenes.py)
+SCENES = ("", "Title", "FrontMenu", "SlotMenu", "StageSelect", "Gameplay", "PauseMenu", "Options", "Shop")
+_SCENE_IDS = {n:i for i,n in enumerate(SCENES)}
+
+class FlightRecorder:
+    CAPACITY = 8192
+    SPIKE_MS = 50.0  # frames slower than this get the ring persisted
+    SPIKE_COOLDOWN = 5.0  # seconds between spike copies
+
+    def __init__(self, directory=FLIGHT_DIR, capacity=CAPACITY, writer=None):
+        self.dir = str(directory)
+        self.capacity = capacity
+        self.writer = writer  # SaveWriter: spike copies are written off the frame thread
+        self.frame = 0
+        self._last_spike = 0.0
+        os.makedirs(self.dir, exist_ok=True)
+        self.path = os.path.join(self.dir, "flight.ring")
+        if os.path.exists(self.path):
+            # keep the previous session's ring (it may end in a hard crash)
+            os.replace(self.path, os.path.join(self.dir, "flight.prev.ring"))
+        size = _HEAD.size + capacity*_REC.size
+        with open(self.path, "wb") as f:
+            f.truncate(size)
+        self._f = open(self.path, "r+b")
+        self.mm = mmap.mmap(self._f.fileno(), size)
+        _HEAD.pack_into(self.mm, 0, MAGIC, VERSION, _REC.size, capacity, 0)
+        self._prev_hook = sys.excepthook
+        sys.excepthook = self._on_crash
+
+    def record(self, engine, work_ms, dt):
+        # a few microseconds: one pack_into per frame plus the header counter
+        scene = engine.scenes.top; gcp = engine.gc_policy
+        rec = _REC.pack_into
+        i = self.frame % self.capacity
+        rec(self.mm, _HEAD.size + i*_REC.size, self.frame, time.time(), work_ms, dt*1000.0,
+            gcp.frame_ms, min(gcp.frame_count, 0xffff), engine.stage, len(engine.enemies), len(engine.collectibles),
+            _SCENE_IDS.get(type(scene).__name__, 0) if scene is not None else 0)
+        self.frame += 1
+        struct.pack_into("<Q", self.mm, _HEAD.size - 8, self.frame)
+        if work_ms > self.SPIKE_MS:
+            now = time.monotonic()
+            if now - self._last_spike >= self.SPIKE_COOLDOWN:
+                self._last_spike = now
+                self.persist("spike")
+
+    def persist(self, reason):
+        path = os.path.join(self.dir, time.strftime(f"{reason}-%Y%m%d-%H%M%S.ring"))
+        raw = bytes(self.mm)
+        if self.writer is not None and reason != "crash":
+            self.writer.submit(path, raw)
+        else:
+            try:
+                with open(path, "wb") as f: f.write(raw)
+            except OSError as e:
+                print("[flight] persist failed:", e)
+        print(f"[flight] {reason}: ring copied to {path}")
+        return path
+
+    def _on_crash(self, *exc):
+        try: self.persist("crash")
+        except Exception: pass
+        self._prev_hook(*exc)
+
+    def close(self):
+        if sys.excepthook == self._on_crash: sys.excepthook = self._prev_hook
+        try:
+            self.mm.flush(); self.mm.close(); self._f.close()
+        except Exception:
+            pass
+
+def read(path):
+    # records oldest first as dicts
+    with open(path, "rb") as f: raw = f.read()
+    magic,version,rec_size,capacity,frames = _HEAD.unpack_from(raw, 0)
+    if magic != MAGIC or version != VERSION or rec_size != _REC.size:
+        raise ValueError("not a flight recorder file")
+    out = []
+    for n in range(max(0, frames - capacity), frames):
+        v = _REC.unpack_from(raw, _HEAD.size + (n % capacity)*rec_size)
+        out.append({"frame": v[0], "time": v[1], "work_ms": v[2], "dt_ms": v[3], "gc_ms": v[4], "gc": v[5],
+                    "stage": v[6], "enemies": v[7], "collectibles": v[8], "scene": SCENES[v[9]] if v[9] < len(SCENES) else "?"})
+    return out
+
+def _main(argv):
+    path = argv[1] if len(argv) > 1 else os.path.join(str(FLIGHT_DIR), "flight.ring")
+    recs = read(path)
+    if not recs:
+        print("no frames recorded"); return
+    work = sorted(r["work_ms"] for r in recs)
+    print(f"{len(recs)} frames, p50 {work[len(work)//2]:.2f} ms, worst {work[-1]:.2f} ms")
+    worst = sorted(recs, key=lambda r: -r["work_ms"])[:10]
+    for r in sorted(worst, key=lambda r: r["frame"]):
+        print(f"  frame {r['frame']:>7} {time.strftime('%H:%M:%S', time.localtime(r['time']))} work {r['work_ms']:7.2f} ms  "
+              f"gc {r['gc']}/{r['gc_ms']:.2f} ms  stage {r['stage']} enemies {r['enemies']} collect {r['collectibles']} {r['scene']}")
+
+if __name__ == "__main__":
+    _main(sys.argv)
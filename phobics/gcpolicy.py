@@ -0,0 +1,65 @@
+# phobics/gcpolicy.py
+# When the cyclic garbage collector runs. Startup objects (assets, fonts,
+# config) are frozen out of the collector after load. During gameplay
+# automatic collection is off and the young generations are collected at
+# frame end once enough allocations pile up; full collections run at stage
+# transitions and when a menu or the shop opens, where a pause is not seen.
+# Every collection's pause is measured through gc.callbacks.
+import gc
+import time
+
+from .trace import TRACER
+
+class GcPolicy:
+    YOUNG_LIMIT = 20000  # gameplay: gen0 count that triggers collect(1) at frame end
+
+    def __init__(self):
+        self.gameplay = False
+        self.frame_ms = 0.0; self.frame_count = 0  # pauses since begin_frame
+        self.total_ms = 0.0; self.collections = 0; self.worst_ms = 0.0
+        self._t0 = 0.0
+        self._pending = []  # (start, end, args) for the tracer, flushed in end_frame
+        gc.callbacks.append(self._on_gc)
+
+    def _on_gc(self, phase, info):
+        # runs inside the collector: no locks, just bookkeeping
+        if phase == "start":
+            self._t0 = time.perf_counter(); return
+        now = time.perf_counter(); ms = (now - self._t0)*1000.0
+        self.frame_ms += ms; self.frame_count += 1
+        self.total_ms += ms; self.collections += 1
+        if ms > self.worst_ms: self.worst_ms = ms
+        if TRACER.enabled:
+            self._pending.append((self._t0, now, {"generation": info["generation"], "collected": info["collected"]}))
+
+    def freeze(self):
+        # after asset load: move everything alive now to the permanent generation
+        gc.unfreeze(); gc.collect(); gc.freeze()
+
+    def set_gameplay(self, on):
+        if on == self.gameplay: return
+        self.gameplay = on
+        if on:
+            gc.disable()
+        else:
+            gc.enable(); gc.collect()  # a menu or the shop just opened
+
+    def transition(self):
+        # stage start/restart: the old stage's objects are garbage now
+        gc.collect()
+
+    def begin_frame(self):
+        self.frame_ms = 0.0; self.frame_count = 0
+
+    def end_frame(self):
+        if self.gameplay and gc.get_count()[0] > self.YOUNG_LIMIT:
+            gc.collect(1)
+        if self._pending:
+            pending, self._pending = self._pending, []
+            for start,end,args in pending:
+                TRACER.complete("gc", "gc", start, end, args)
+
+    def close(self):
+        try: gc.callbacks.remove(self._on_gc)
+        except ValueError: pass
+        gc.enable()
@@ -0,0 +1,49 @@
+# phobics/hud.py
+import pygame
+from pygame import Rect
+
+from .widgets import font
+
+class Hud:
+    """In-game text layer (stage, shot, PAUSED) drawn by Gameplay over the world.
+
+    The bound values are read every frame, but the text is only rendered and
+    composed into the cached surface when one of them changed; in steady
+    state drawing the HUD is a single blit. renders counts re-compositions.
+    """
+    BINDINGS = ("stage", "shot_available", "paused")
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.renders = 0
+        self._values = None
+        self._surf = None
+        self._pos = (0,0)
+
+    def values(self):
+        return tuple(getattr(self.engine, name) for name in self.BINDINGS) + (self.engine.window_w,)
+
+    def invalidate(self):
+        self._values = None
+
+    def _compose(self, values):
+        stage,shot,paused,w = values
+        items = [
+            (font(24).render(f"Stage: {stage}", True, (240,240,240)), (8,8)),
+            (font(24).render("Shot: READY" if shot else "Shot: USED", True, (200,200,200)), (8,32)),
+        ]
+        if paused:
+            # only drawn into the frozen frame under the shop
+            p = font(64).render("PAUSED", True, (200,40,40))
+            items.append((p, p.get_rect(center=(w//2, 40)).topleft))
+        bounds = Rect(items[0][1], items[0][0].get_size()).unionall([Rect(pos, s.get_size()) for s,pos in items])
+        surf = pygame.Surface(bounds.size, pygame.SRCALPHA)
+        surf.blits([(s, (x - bounds.x, y - bounds.y)) for s,(x,y) in items], doreturn=False)
+        self._surf = surf; self._pos = bounds.topleft
+        self.renders += 1
+
+    def draw(self, screen):
+        values = self.values()
+        if values != self._values:
+            self._compose(values); self._values = values
+        screen.blit(self._surf, self._pos)
@@ -0,0 +1,85 @@
+# phobics/journal.py
+import os
+import json
+import time
+
+class SlotJournal:
+    """Append-only autosave log for one save slot (save_slotN.log).
+
+    Each event is one JSON line with a sequence number. Lines go into a
+    buffered file and reach the OS at most every FLUSH_INTERVAL seconds.
+    The engine periodically compacts the log into the slot file, which
+    records the last sequence it contains (journal_seq). Once that slot
+    write has landed, the log is replaced (temp file, fsync, rename) with
+    only the newer records, so a crash leaves the old or the new log.
+    Recovery is read_slot() plus replay(records(path, journal_seq)).
+    """
+    COMPACT_EVERY = 32
+    FLUSH_INTERVAL = 1.0
+
+    def __init__(self, path, seq=0):
+        self.path = str(path)
+        self.seq = int(seq)
+        self.since_compact = 0
+        self._tail = []  # (seq, line) appended since the last compaction was requested
+        self._compacting = None  # seq covered by a slot write still in flight
+        self._last_flush = time.monotonic()
+        self._f = open(self.path, "ab", buffering=64*1024)
+
+    def append(self, ev, **fields):
+        self.seq += 1
+        fields["seq"] = self.seq; fields["ev"] = ev
+        line = json.dumps(fields, separators=(",",":")).encode("utf-8") + b"\n"
+        self._f.write(line)
+        self._tail.append((self.seq, line))
+        self.since_compact += 1
+        return self.seq
+
+    def needs_compaction(self):
+        return self.since_compact >= self.COMPACT_EVERY
+
+    def compacted(self, seq):
+        # a slot snapshot covering records <= seq has been submitted
+        self._compacting = seq
+        self.since_compact = 0
+
+    def rewrite_due(self, snapshot_landed):
+        # tick() will replace the log file
+        return self._compacting is not None and snapshot_landed
+
+    def tick(self, snapshot_landed, now=None):
+        now = time.monotonic() if now is None else now
+        if self.rewrite_due(snapshot_landed):
+            keep = [(s,l) for s,l in self._tail if s > self._compacting]
+            self._f.close()
+            tmp = self.path + ".tmp"
+            try:
+                with open(tmp, "wb") as f:
+                    f.write(b"".join(line for _,line in keep)); f.flush(); os.fsync(f.fileno())
+                os.replace(tmp, self.path)
+                self._tail = keep
+            except Exception as e:
+                print("[save] journal rewrite failed:", e)  # the full log is still there
+            self._f = open(self.path, "ab", buffering=64*1024)
+            self._compacting = None
+            self._last_flush = now
+        elif now - self._last_flush >= self.FLUSH_INTERVAL:
+            self._f.flush(); self._last_flush = now
+
+    def close(self):
+        try: self._f.close()
+        except Exception: pass
+
+    @staticmethod
+    def records(path, after_seq=0):
+        # records newer than after_seq; stops at a torn trailing line
+        out = []
+        try:
+            with open(path, "rb") as f:
+                for line in f:
+                    try: rec = json.loads(line)
+                    except ValueError: break
+                    if rec.get("seq", 0) > after_seq: out.append(rec)
+        except OSError:
+            pass
+        return out
@@ -1,14 +1,39 @@
 # phobics/loader.py
 import os
+import sys
 import pygame
 
-from .settings import TEX_DIR, SND_DIR
+from .settings import TEX_DIR, SND_DIR, ASSET_PACK, BAKED_DIR
+from .pack import AssetPack
+from .pixcache import PixelCache
+from .trace import traced
+
+# texture/sound keys -> file names (shared with the asset watcher)
+TEXTURE_FILES = {
+    "player":"player.png",
+    "enemy":"enemy.png",
+    "collect":"collectible.png",
+    "proj":"projectile.png",
+    "arrow":"arrow.png",
+}
+SOUND_FILES = {
+    "shoot":"shoot.wav",
+    "hit":"hit.wav",
+    "collect":"collect.wav",
+    "select":"select.wav",
+}
 
 class SafeLoader:
-    def __init__(self):
+    def __init__(self, pixel_cache=None):
         # assume pygame.init has been called by the caller
         self.textures = {}
         self.sounds = {}
+        self.premultiplied = set()  # texture keys loaded from baked (premultiplied) files
+        self._last_baked = False
+        self.pack = AssetPack.open_if_exists(ASSET_PACK)
+        if pixel_cache is None:
+            pixel_cache = not os.environ.get("PHOBICS_NO_PIXCACHE")
+        self.pixcache = PixelCache() if pixel_cache else None
         self._create_fallbacks()
 
     def _create_fallbacks(self):
@@ -21,54 +46,97 @@ class SafeLoader:
         self.textures["collect"] = make_surf((200,170,80),(20,20))
         self.textures["proj"] = make_surf((0,200,200),(10,10))
         self.textures["arrow"] = make_surf((0,200,200),(18,4))
+        self.fallbacks = dict(self.textures)
         self.sounds["shoot"] = None
         self.sounds["hit"] = None
         self.sounds["collect"] = None
         self.sounds["select"] = None
 
-    def load_image_safe(self, filename):
+    def _open_packed(self, path, name):
+        # packed entry for name, used in frozen builds or when the loose file is gone
+        if self.pack is None or name not in self.pack:
+            return None
+        if getattr(sys, "frozen", False) or not os.path.exists(path):
+            return self.pack.open(name)
+        return None
+
+    def _open_baked(self, path, name):
+        # baked output for name (e.g. "textures/player.png"), unless the source is newer
+        baked = os.path.join(BAKED_DIR, *name.split("/"))
+        try:
+            if os.path.getmtime(baked) >= os.path.getmtime(path):
+                return open(baked, "rb")
+        except OSError:
+            if os.path.exists(baked): return open(baked, "rb")
+        return self._open_packed(path, "baked/" + name)
+
+    @traced("assets")
+    def load_image_safe(self, filename, fileobj=None):
+        # fileobj: optional already-read file (e.g. bytes handed over by the watcher)
         path = os.path.join(TEX_DIR, filename)
         key = os.path.splitext(filename)[0]
-        if not os.path.exists(path):
+        self._last_baked = False
+        if fileobj is None:
+            fileobj = self._open_baked(path, "textures/" + filename)
+            self._last_baked = fileobj is not None
+        if fileobj is None:
+            fileobj = self._open_packed(path, "textures/" + filename)
+        if fileobj is None and not os.path.exists(path):
             return self.textures.get(key)
-        try:
-            img = pygame.image.load(path)
+        def decode(f):
+            img = pygame.image.load(f, filename)
             # convert_alpha only if display initialized
             if pygame.display.get_surface():
                 img = img.convert_alpha()
             return img
+        try:
+            if self.pixcache is not None:
+                if fileobj is not None:
+                    with fileobj: data = fileobj.read()
+                else:
+                    with open(path, "rb") as f: data = f.read()
+                return self.pixcache.load(key, data, decode)
+            if fileobj is not None:
+                with fileobj: return decode(fileobj)
+            return decode(path)
         except Exception:
+            self._last_baked = False
             return self.textures.get(key)
 
-    def load_sound_safe(self, filename):
+    @traced("assets")
+    def load_sound_safe(self, filename, fileobj=None):
         path = os.path.join(SND_DIR, filename)
-        if not os.path.exists(path):
+        if fileobj is None:
+            fileobj = self._open_baked(path, "sounds/" + filename)
+        if fileobj is None:
+            fileobj = self._open_packed(path, "sounds/" + filename)
+        if fileobj is None and not os.path.exists(path):
             return None
         try:
+            if fileobj is not None:
+                with fileobj: return pygame.mixer.Sound(fileobj)
             return pygame.mixer.Sound(path)
         except Exception:
             return None
 
-    def reload_all(self):
-        mapping = {
-            "player":"player.png",
-            "enemy":"enemy.png",
-            "collect":"collectible.png",
-            "proj":"projectile.png",
-            "arrow":"arrow.png",
-        }
-        for k,f in mapping.items():
-            surf = self.load_image_safe(f)
-            if surf is None:
-                surf = self.textures.get(k)
-            self.textures[k]=surf
+    def reload_texture(self, key, fileobj=None):
+        surf = self.load_image_safe(TEXTURE_FILES[key], fileobj)
+        if surf is None:
+            surf = self.textures.get(key)
+        elif self._last_baked:
+            self.premultiplied.add(key)
+        else:
+            self.premultiplied.discard(key)
+        self.textures[key]=surf
+        return surf
 
-        sound_map = {
-            "shoot":"shoot.wav",
-            "hit":"hit.wav",
-            "collect":"collect.wav",
-            "select":"select.wav",
-        }
-        for k,f in sound_map.items():
-            snd = self.load_sound_safe(f)
-            self.sounds[k]=snd
+    def reload_sound(self, key, fileobj=None):
+        snd = self.load_sound_safe(SOUND_FILES[key], fileobj)
+        self.sounds[key]=snd
+        return snd
+
+    def reload_all(self):
+        for k in TEXTURE_FILES:
+            self.reload_texture(k)
+        for k in SOUND_FILES:
+            self.reload_sound(k)
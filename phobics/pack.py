@@ -0,0 +1,121 @@
+# phobics/pack.py
+# Single-file asset archive: an index header followed by the raw file bytes.
+# Built once at release time (python -m phobics.pack), opened at runtime with
+# mmap so loaders read straight out of the mapping instead of loose files.
+import os
+import io
+import sys
+import mmap
+import struct
+
+MAGIC = b"PHPK"
+VERSION = 1
+_HEADER = struct.Struct("<4sHI")     # magic, version, entry count
+_ENTRY = struct.Struct("<HQQ8s")     # name length, offset, length, format
+
+def build_pack(src_dir, out_path):
+    # pack every file below src_dir; names are relative with '/' separators
+    files = []
+    for root,dirs,names in os.walk(src_dir):
+        dirs.sort()
+        for n in sorted(names):
+            full = os.path.join(root, n)
+            rel = os.path.relpath(full, src_dir).replace(os.sep, "/")
+            files.append((rel, full))
+    index_size = _HEADER.size + sum(_ENTRY.size + len(rel.encode("utf-8")) for rel,_ in files)
+    entries = []; offset = index_size
+    for rel,full in files:
+        length = os.path.getsize(full)
+        fmt = os.path.splitext(rel)[1].lstrip(".").lower().encode("ascii")[:8]
+        entries.append((rel.encode("utf-8"), offset, length, fmt))
+        offset += length
+    tmp = str(out_path) + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(entries)))
+        for name,off,length,fmt in entries:
+            f.write(_ENTRY.pack(len(name), off, length, fmt)); f.write(name)
+        for rel,full in files:
+            with open(full, "rb") as src:
+                f.write(src.read())
+    os.replace(tmp, out_path)
+    return len(entries)
+
+class PackFile(io.RawIOBase):
+    """Read-only file object over a memoryview slice (no copy of the entry)."""
+
+    def __init__(self, view):
+        self._view = view
+        self._pos = 0
+
+    def readable(self): return True
+    def seekable(self): return True
+    def tell(self): return self._pos
+
+    def seek(self, pos, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR: pos += self._pos
+        elif whence == io.SEEK_END: pos += len(self._view)
+        self._pos = max(0, min(pos, len(self._view)))
+        return self._pos
+
+    def readinto(self, b):
+        n = min(len(b), len(self._view) - self._pos)
+        if n <= 0: return 0
+        b[:n] = self._view[self._pos:self._pos+n]
+        self._pos += n
+        return n
+
+    def close(self):
+        self._view = memoryview(b"")
+        super().close()
+
+class AssetPack:
+    def __init__(self, path):
+        self.path = str(path)
+        self._file = open(self.path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close(); raise
+        self._view = memoryview(self._map)
+        self.index = {}  # name -> (offset, length, format)
+        magic,version,count = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close(); raise ValueError(f"not a v{VERSION} asset pack: {self.path}")
+        pos = _HEADER.size
+        for _ in range(count):
+            nlen,off,length,fmt = _ENTRY.unpack_from(self._map, pos); pos += _ENTRY.size
+            name = bytes(self._map[pos:pos+nlen]).decode("utf-8"); pos += nlen
+            self.index[name] = (off, length, fmt.rstrip(b"\0").decode("ascii"))
+
+    @classmethod
+    def open_if_exists(cls, path):
+        if not os.path.exists(path): return None
+        try:
+            return cls(path)
+        except Exception as e:
+            print("[pack] couldn't open", path, e)
+            return None
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def view(self, name):
+        off,length,_ = self.index[name]
+        return self._view[off:off+length]
+
+    def open(self, name):
+        return PackFile(self.view(name))
+
+    def close(self):
+        try:
+            self._view.release(); self._map.close()
+        except Exception:
+            pass  # outstanding PackFile views keep the map alive
+        self._file.close()
+
+if __name__ == "__main__":
+    from .settings import ASSETS, ASSET_PACK
+    src = sys.argv[1] if len(sys.argv) > 1 else ASSETS
+    out = sys.argv[2] if len(sys.argv) > 2 else ASSET_PACK
+    n = build_pack(src, out)
+    print(f"[pack] wrote {n} files to {out}")
@@ -0,0 +1,137 @@
+# phobics/perf.py
+import time
+from collections import deque
+import pygame
+
+from .widgets import font
+
+PHASES = ("events", "io", "movement", "projectile", "collisions", "update",
+          "backdrop", "vignette", "entities", "crt", "overlays", "hud", "perf", "flip", "gc")
+
+def percentile(sorted_values, p):
+    if not sorted_values: return 0.0
+    k = min(len(sorted_values)-1, max(0, int(round(p/100.0*(len(sorted_values)-1)))))
+    return sorted_values[k]
+
+class FrameTimer:
+    """Splits each frame into named phases with lap().
+
+    lap(name) charges the time since the previous lap (or begin_frame) to
+    name, so hooks are sequential marks, not nested scopes; note() adds
+    time measured elsewhere, like GC pauses. While disabled
+    every hook returns after one attribute check. Timing is on while the
+    overlay is shown or a trace.Tracer is attached; with a tracer each lap
+    and frame is also recorded as a trace event.
+    """
+
+    def __init__(self, history=240):
+        self.enabled = False
+        self.show = False  # overlay visible
+        self.tracer = None
+        self.history = history
+        self.frames = deque(maxlen=history)  # frame work time, ms (excludes the clock.tick wait)
+        self.dts = deque(maxlen=history)  # full frame interval, s
+        self.phases = {}  # name -> deque of ms, one entry per frame
+        self._cur = {}
+        self._start = self._last = 0.0
+
+    def toggle(self):
+        self.show = not self.show
+        self.frames.clear(); self.dts.clear(); self.phases.clear(); self._cur = {}
+        self._update_enabled()
+        return self.show
+
+    def trace(self, tracer):
+        self.tracer = tracer
+        self._update_enabled()
+
+    def _update_enabled(self):
+        was = self.enabled
+        self.enabled = self.show or self.tracer is not None
+        if self.enabled and not was: self.begin_frame()
+
+    def begin_frame(self):
+        if not self.enabled: return
+        self._start = self._last = time.perf_counter()
+        self._cur = {}
+
+    def lap(self, name):
+        if not self.enabled: return
+        now = time.perf_counter()
+        self._cur[name] = self._cur.get(name, 0.0) + (now - self._last)*1000.0
+        if self.tracer is not None: self.tracer.complete(name, "frame", self._last, now)
+        self._last = now
+
+    def note(self, name, ms):
+        # time measured elsewhere (GC pauses); overlaps the laps
+        if not self.enabled: return
+        self._cur[name] = self._cur.get(name, 0.0) + ms
+
+    def end_frame(self, dt):
+        if not self.enabled: return
+        now = time.perf_counter()
+        if self.tracer is not None: self.tracer.complete("frame", "frame", self._start, now, {"dt": dt})
+        self.frames.append((now - self._start)*1000.0)
+        self.dts.append(dt)
+        for name in set(self.phases) | set(self._cur):
+            q = self.phases.get(name)
+            if q is None: q = self.phases[name] = deque(maxlen=self.history)
+            q.append(self._cur.get(name, 0.0))
+
+    def stats(self):
+        frames = sorted(self.frames)
+        dt = sum(self.dts)/len(self.dts) if self.dts else 0.0
+        return {
+            "fps": 1.0/dt if dt else 0.0,
+            "p50": percentile(frames, 50), "p95": percentile(frames, 95), "p99": percentile(frames, 99),
+            "worst": frames[-1] if frames else 0.0,
+            "phases": {n: sum(q)/len(q) for n,q in self.phases.items() if q},
+        }
+
+class PerfOverlay:
+    """FPS, frame-time graph and per-phase averages (F3).
+
+    The panel is re-rendered every REFRESH frames; in between it is one blit.
+    """
+    REFRESH = 15
+    GRAPH = (240, 60)
+    BUDGET_MS = 1000.0/60
+
+    def __init__(self, timer):
+        self.timer = timer
+        self.renders = 0
+        self._surf = None
+        self._age = 0
+
+    def _render(self):
+        t = self.timer; st = t.stats()
+        f = font(18); col = (220,220,160)
+        rows = [(f.render(f"FPS {st['fps']:.1f}", True, col), f.render(
+            f"p50 {st['p50']:.2f}  p95 {st['p95']:.2f}  p99 {st['p99']:.2f}  worst {st['worst']:.2f} ms", True, col))]
+        for name in PHASES:
+            if name in st["phases"]:
+                rows.append((f.render(name, True, col), f.render(f"{st['phases'][name]:.2f} ms", True, col)))
+        gw,gh = self.GRAPH; lh = f.get_linesize()
+        cx = 12 + max(a.get_width() for a,_ in rows)  # name column is right-aligned to cx
+        w = max(gw + 12, cx + 8 + max(b.get_width() for _,b in rows) + 6)
+        h = 4 + len(rows)*lh + 6 + gh + 6
+        surf = pygame.Surface((w, h), pygame.SRCALPHA); surf.fill((0,0,0,170))
+        y = 4
+        for a,b in rows:
+            surf.blit(a, (cx - a.get_width(), y)); surf.blit(b, (cx + 8, y)); y += lh
+        # rolling frame-time graph; the line marks the 60 FPS budget
+        gy = y + 6; scale = gh/max(2*self.BUDGET_MS, st['worst'])
+        pygame.draw.rect(surf, (60,60,60), (6, gy, gw, gh), 1)
+        pygame.draw.line(surf, (90,140,90), (6, gy+gh-int(self.BUDGET_MS*scale)), (6+gw-1, gy+gh-int(self.BUDGET_MS*scale)))
+        frames = list(t.frames)[-gw:]
+        for x,ms in enumerate(frames):
+            bar = min(gh, int(ms*scale))
+            col = (200,80,60) if ms > self.BUDGET_MS else (200,200,200)
+            pygame.draw.line(surf, col, (6+x, gy+gh-1), (6+x, gy+gh-bar))
+        self._surf = surf; self.renders += 1
+
+    def draw(self, screen):
+        self._age -= 1
+        if self._surf is None or self._age <= 0:
+            self._render(); self._age = self.REFRESH
+        screen.blit(self._surf, (screen.get_width() - self._surf.get_width() - 8, 8))
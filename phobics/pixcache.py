@@ -0,0 +1,131 @@
+# phobics/pixcache.py
+# On-disk cache of decoded, display-format texture pixels. Entries are named
+# <texture>-<source md5>-<pixel format>.raw so a changed PNG (or a different
+# display format) simply misses and the stale entry is swept on write.
+import os
+import io
+import sys
+import mmap
+import time
+import struct
+import hashlib
+import pygame
+
+from .settings import CACHE_DIR
+
+_HEADER = struct.Struct("<4sII")  # magic, width, height
+MAGIC = b"PXC1"
+
+# (rmask, gmask, bmask, amask) of a 32-bit display surface -> tobytes/frombuffer format
+_FORMATS = {
+    (0xff0000, 0xff00, 0xff, 0xff000000): "BGRA",
+    (0xff, 0xff00, 0xff0000, 0xff000000): "RGBA",
+    (0xff00, 0xff0000, 0xff000000, 0xff): "ARGB",
+}
+
+def display_format():
+    # (format, native) for what convert_alpha() produces; native=False means
+    # surfaces read back as RGBA still need a convert. None without a display.
+    if pygame.display.get_surface() is None:
+        return None
+    try:
+        probe = pygame.Surface((1,1), pygame.SRCALPHA).convert_alpha()
+    except Exception:
+        return None
+    fmt = _FORMATS.get(tuple(probe.get_masks()))
+    return (fmt, True) if fmt else ("RGBA", False)
+
+class PixelCache:
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = str(cache_dir)
+        self.fmt = None
+        self.native = True
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, name, digest):
+        return os.path.join(self.cache_dir, f"{name}-{digest}-{self.fmt}.raw")
+
+    def load(self, name, data, decode):
+        """Surface for texture name from source bytes data.
+
+        decode(fileobj) is only called on a miss and must return a
+        display-converted surface; that result is written to the cache.
+        """
+        if self.fmt is None:
+            found = display_format()
+            if found is None:
+                return decode(io.BytesIO(data))
+            self.fmt,self.native = found
+        digest = hashlib.md5(data).hexdigest()
+        path = self._entry_path(name, digest)
+        surf = self._read(name, path)
+        if surf is not None:
+            self.hits += 1
+            return surf
+        self.misses += 1
+        surf = decode(io.BytesIO(data))
+        if surf is not None:
+            self._write(name, path, surf)
+        return surf
+
+    def _read(self, name, path):
+        try:
+            with open(path, "rb") as f:
+                m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            magic,w,h = _HEADER.unpack_from(m, 0)
+            if magic != MAGIC or len(m) != _HEADER.size + w*h*4:
+                m.close(); return None
+            # frombuffer over the read-only map would crash on the first write to
+            # the texture; copy (or convert) into a Surface that owns its pixels
+            view = pygame.image.frombuffer(memoryview(m)[_HEADER.size:], (w,h), self.fmt)
+            surf = view.copy() if self.native else view.convert_alpha()
+            del view
+        except Exception:
+            surf = None
+        try: m.close()
+        except BufferError: pass  # a failed frombuffer may still hold the view
+        return surf
+
+    def _write(self, name, path, surf):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            w,h = surf.get_size()
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(_HEADER.pack(MAGIC, w, h))
+                f.write(pygame.image.tobytes(surf, self.fmt))
+            os.replace(tmp, path)
+        except Exception as e:
+            print("[pixcache] write failed:", e); return
+        # sweep entries for older versions of this texture
+        keep = os.path.basename(path)
+        for fn in os.listdir(self.cache_dir):
+            if fn.startswith(name + "-") and fn != keep:
+                try: os.remove(os.path.join(self.cache_dir, fn))
+                except OSError: pass  # still mapped on some platforms
+
+def _bench(rounds=5):
+    # cold-start texture load time with and without the cache
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init(); pygame.display.set_mode((320,240))
+    from .loader import SafeLoader
+    def run(use_cache):
+        best = None
+        for _ in range(rounds):
+            loader = SafeLoader(pixel_cache=use_cache)
+            t0 = time.perf_counter()
+            for k in list(loader.textures):
+                loader.reload_texture(k)
+            dt = time.perf_counter() - t0
+            best = dt if best is None else min(best, dt)
+        return best
+    SafeLoader(pixel_cache=True).reload_all()  # populate
+    plain = run(False); cached = run(True)
+    print(f"[pixcache] textures: decode {plain*1000:.2f} ms, cached {cached*1000:.2f} ms")
+
+if __name__ == "__main__":
+    _bench(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
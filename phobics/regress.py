@@ -0,0 +1,192 @@
+# phobics/regress.py
+# Benchmark history and regression gate. Runs phobics.bench REPEAT times
+# (each in a fresh process), stores the results per commit in
+# benchmarks/history.json and compares them against a baseline from the
+# same machine. A scenario regresses when its p95 frame time rises or its
+# FPS drops by more than THRESHOLD and a one-sided Mann-Whitney U test over
+# the repeated runs says the shift is not noise (p < ALPHA). Exits 1 on any
+# regression. Offline: nothing but git and the local file.
+#
+#   python -m phobics.regress run [scenario ...] [--repeat 5] [--baseline COMMIT] [--no-store]
+#   python -m phobics.regress show
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+
+from .settings import HERE, BENCH_DIR
+
+REPEAT = 5
+THRESHOLD = 0.05  # relative change of the medians
+ALPHA = 0.05
+KEEP = 200  # history entries kept
+# metric -> True when higher is worse
+METRICS = {"p95_ms": True, "fps": False}
+
+def history_path():
+    return os.path.join(str(BENCH_DIR), "history.json")
+
+def load_history(path=None):
+    try:
+        with open(path or history_path(), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+def save_history(entries, path=None):
+    path = path or history_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(entries[-KEEP:], f, indent=1)
+    os.replace(tmp, path)
+
+def git_commit():
+    # (sha, dirty); ("unknown", False) outside a git checkout
+    try:
+        sha = subprocess.run(["git", "rev-parse", "HEAD"], cwd=str(HERE), capture_output=True, text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=str(HERE), capture_output=True, text=True).stdout
+        return sha, bool(status.strip())
+    except Exception:
+        return "unknown", False
+
+def run_bench(scenarios, frames, repeat):
+    # one bench report per repeat, each from its own interpreter
+    reports = []
+    for i in range(repeat):
+        fd,out = tempfile.mkstemp(suffix=".json"); os.close(fd)
+        try:
+            cmd = [sys.executable, "-m", "phobics.bench", "--frames", str(frames), "--out", out] + list(scenarios)
+            # exit 1 is bench's surfaces gate; the timings in --out are still good
+            rc = subprocess.run(cmd, cwd=str(HERE), stdout=subprocess.DEVNULL).returncode
+            if rc not in (0, 1): raise subprocess.CalledProcessError(rc, cmd)
+            with open(out, "r", encoding="utf-8") as f: reports.append(json.load(f))
+        finally:
+            try: os.remove(out)
+            except OSError: pass
+        print(f"[regress] run {i+1}/{repeat} done", file=sys.stderr)
+    return reports
+
+def samples(entry, scenario, metric):
+    return [r["scenarios"][scenario][metric] for r in entry["runs"] if scenario in r["scenarios"]]
+
+def median(values):
+    v = sorted(values); n = len(v)
+    return (v[n//2] if n % 2 else (v[n//2-1] + v[n//2])/2.0) if v else 0.0
+
+def mann_whitney_greater(xs, ys):
+    """One-sided p-value for "xs tend to be larger than ys".
+
+    Exact null distribution of U (ties count a half, which the exact
+    distribution slightly overstates; fine for frame timings).
+    """
+    n,m = len(xs), len(ys)
+    if not n or not m: return 1.0
+    u = sum(1.0 if x > y else 0.5 if x == y else 0.0 for x in xs for y in ys)
+    # counts[i][j][k]: orderings of i xs and j ys with U == k
+    counts = [[[0]*(n*m+1) for _ in range(m+1)] for _ in range(n+1)]
+    for i in range(n+1):
+        for j in range(m+1):
+            if i == 0 or j == 0:
+                counts[i][j][0] = 1; continue
+            for k in range(i*j+1):
+                # largest element is an x (beats all j ys) or a y
+                a = counts[i-1][j][k-j] if k >= j else 0
+                b = counts[i][j-1][k]
+                counts[i][j][k] = a + b
+    dist = counts[n][m]; total = sum(dist)
+    return sum(c for k,c in enumerate(dist) if k >= u - 1e-9)/total
+
+def compare(base, new, threshold=THRESHOLD, alpha=ALPHA):
+    # rows (scenario, metric, base median, new median, change, p, verdict)
+    rows = []
+    for scenario in new["runs"][0]["scenarios"]:
+        for metric,higher_worse in METRICS.items():
+            b = samples(base, scenario, metric); n = samples(new, scenario, metric)
+            if not b or not n:
+                rows.append((scenario, metric, None, median(n), None, None, "new")); continue
+            bm,nm = median(b), median(n)
+            change = (nm - bm)/bm if bm else 0.0
+            worse = change if higher_worse else -change
+            p = mann_whitney_greater(n, b) if higher_worse else mann_whitney_greater(b, n)
+            if worse > threshold and p < alpha: verdict = "REGRESSED"
+            elif -worse > threshold and p < alpha: verdict = "improved"
+            else: verdict = "ok"
+            rows.append((scenario, metric, bm, nm, change, p, verdict))
+    return rows
+
+def format_rows(rows):
+    lines = [f"{'scenario':<14} {'metric':<7} {'baseline':>10} {'new':>10} {'change':>8} {'p':>6}  verdict"]
+    for scenario,metric,bm,nm,change,p,verdict in rows:
+        bs = f"{bm:10.2f}" if bm is not None else f"{'-':>10}"
+        cs = f"{change:+8.1%}" if change is not None else f"{'-':>8}"
+        ps = f"{p:6.3f}" if p is not None else f"{'-':>6}"
+        lines.append(f"{scenario:<14} {metric:<7} {bs} {nm:10.2f} {cs} {ps}  {verdict}")
+    return "\n".join(lines)
+
+def find_baseline(entries, host, sha, dirty, commit=None):
+    # newest clean entry from this machine: the same commit when the tree is
+    # dirty (measures the local change), else the previous commit measured,
+    # else an earlier run of this commit (never skip the comparison)
+    clean = [e for e in reversed(entries) if e.get("host") == host and (commit is not None or not e.get("dirty"))]
+    if commit is not None:
+        return next((e for e in clean if e["commit"].startswith(commit)), None)
+    if dirty:
+        return next((e for e in clean if e["commit"] == sha), None) or next(iter(clean), None)
+    return next((e for e in clean if e["commit"] != sha), None) or next((e for e in clean if e["commit"] == sha), None)
+
+def cmd_run(args):
+    sha,dirty = git_commit()
+    host = platform.node()
+    entries = load_history()
+    base = find_baseline(entries, host, sha, dirty, args.baseline)
+    if base is None and args.baseline:
+        print(f"[regress] no run of {args.baseline} from this machine in {history_path()}")
+        return 1
+    runs = run_bench(args.scenarios, args.frames, args.repeat)
+    entry = {"commit": sha, "dirty": dirty, "host": host, "time": time.time(), "frames": args.frames, "runs": runs}
+    if not args.no_store:
+        entries.append(entry); save_history(entries)
+        print(f"[regress] stored {len(runs)} runs for {sha[:10]}{'+dirty' if dirty else ''} in {history_path()}", file=sys.stderr)
+    if base is None:
+        print("[regress] no earlier clean run from this machine to compare against; nothing compared")
+        return 0
+    print(f"baseline {base['commit'][:10]}{'+dirty' if base.get('dirty') else ''} "
+          f"({time.strftime('%Y-%m-%d %H:%M', time.localtime(base['time']))}, {len(base['runs'])} runs)  "
+          f"vs {sha[:10]}{'+dirty' if dirty else ''} ({len(runs)} runs)")
+    rows = compare(base, entry, args.threshold, args.alpha)
+    print(format_rows(rows))
+    regressed = [r for r in rows if r[-1] == "REGRESSED"]
+    if regressed:
+        print(f"[regress] {len(regressed)} regression(s) past {args.threshold:.0%} (p < {args.alpha})")
+        return 1
+    return 0
+
+def cmd_show(args):
+    for e in load_history():
+        scen = sorted(e["runs"][0]["scenarios"]) if e["runs"] else []
+        print(f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(e['time']))}  {e['commit'][:10]}{'+dirty' if e.get('dirty') else '      '}  "
+              f"{e.get('host','?'):<16} {len(e['runs'])} runs  {', '.join(scen)}")
+    return 0
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m phobics.regress")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run", help="benchmark this tree, store it and compare against the baseline")
+    r.add_argument("scenarios", nargs="*", metavar="scenario", help="phobics.bench scenarios (default: all)")
+    r.add_argument("--repeat", type=int, default=REPEAT, help="bench runs, each in a new process")
+    r.add_argument("--frames", type=int, default=300)
+    r.add_argument("--baseline", help="commit (prefix) to compare against; default: see find_baseline")
+    r.add_argument("--threshold", type=float, default=THRESHOLD, help="relative change that counts (0.05 = 5%%)")
+    r.add_argument("--alpha", type=float, default=ALPHA, help="significance level of the U test")
+    r.add_argument("--no-store", action="store_true", help="compare only, don't add to the history")
+    sub.add_parser("show", help="list stored runs")
+    args = ap.parse_args(argv)
+    return cmd_run(args) if args.cmd == "run" else cmd_show(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
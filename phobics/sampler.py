@@ -0,0 +1,85 @@
+# phobics/sampler.py
+# Opt-in sampling profiler (--profile / PHOBICS_PROFILE). A daemon thread
+# reads the main thread's stack through sys._current_frames() every
+# 1/rate seconds; the main thread brackets each frame with begin_frame() /
+# end_frame(), which files the frame's samples as slow if it blew the
+# budget. stop() writes collapsed stacks ("root;...;leaf count",
+# flamegraph.pl / speedscope input) to profiles/.
+import os
+import sys
+import time
+import threading
+from collections import Counter
+
+from .settings import PROFILE_DIR
+
+class StackSampler:
+    def __init__(self, rate=1000, budget_ms=1000.0/60, thread_id=None):
+        self.interval = 1.0/rate
+        self.budget_ms = budget_ms
+        self.thread_id = thread_id or threading.main_thread().ident
+        self.slow = Counter()  # collapsed stack -> samples, slow frames only
+        self.all = Counter()  # every sample, for comparison
+        self.slow_frames = 0
+        self.frames = 0
+        self._buf = []
+        self._lock = threading.Lock()
+        self._labels = {}  # code object -> "func (file:line)"
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="phobics-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code); frame = frame.f_back
+            if not stack: continue
+            with self._lock:
+                self._buf.append(tuple(stack))
+
+    def begin_frame(self):
+        # drop samples taken while waiting in clock.tick
+        with self._lock:
+            self._buf = []
+
+    def end_frame(self, work_ms):
+        # main thread, once per frame
+        with self._lock:
+            buf, self._buf = self._buf, []
+        self.frames += 1
+        if not buf: return
+        stacks = [";".join(self._label(c) for c in reversed(s)) for s in buf]
+        self.all.update(stacks)
+        if work_ms > self.budget_ms:
+            self.slow_frames += 1
+            self.slow.update(stacks)
+
+    def write(self, directory=PROFILE_DIR):
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        paths = []
+        for name,counts in (("slow", self.slow), ("all", self.all)):
+            path = os.path.join(str(directory), f"{stamp}.{name}.folded")
+            with open(path, "w", encoding="utf-8") as f:
+                for stack,n in counts.most_common():
+                    f.write(f"{stack} {n}\n")
+            paths.append(path)
+        print(f"[profile] {self.slow_frames}/{self.frames} frames over {self.budget_ms:.1f} ms, "
+              f"{sum(self.slow.values())} slow samples -> {paths[0]}")
+        return paths
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        return self.write()
@@ -0,0 +1,289 @@
+# phobics/saves.py
+import os
+import re
+import json
+import queue
+import hashlib
+import threading
+from contextlib import contextmanager, nullcontext
+
+from .trace import traced
+
+SLOT_RE = re.compile(r"^save_slot(\d+)\.json$")
+
+def slot_info(data):
+    # normalised menu metadata for one parsed slot file
+    return {
+        "stage": int(data.get("stage",1)),
+        "unlocked": sorted(set(int(x) for x in data.get("unlocked",[1]))),
+        "timestamp": float(data.get("timestamp",0.0)),
+    }
+
+class SaveWriter:
+    """Background writer for save files.
+
+    submit() only stores the bytes; a worker thread writes them to a temp
+    file, fsyncs and renames over the destination, so a crash leaves either
+    the old or the new file. Submitting empty bytes removes the file
+    instead. Repeated submits for a path that has not been written yet
+    replace each other. Finished writes are reported on self.done as
+    (path, mtime_ns) for the main thread to pick up; removals and failed
+    writes as (path, None). After a failure written(path) stays False until
+    a later submit for that path lands. Writes into a directory listed in
+    self.guards run inside that guard (see SlotIndex.own_change).
+    """
+
+    def __init__(self):
+        self._pending = {}  # path -> bytes not yet on disk
+        self._failed = set()  # paths whose latest write failed
+        self.guards = {}  # normalised directory -> context manager factory
+        self._cond = threading.Condition()
+        self._busy = None
+        self._stop = False
+        self.done = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="phobics-save-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, path, raw):
+        with self._cond:
+            self._pending[str(path)] = raw
+            self._failed.discard(str(path))
+            self._cond.notify()
+
+    def pending(self, path):
+        # latest bytes queued for path, or None once written
+        with self._cond:
+            return self._pending.get(str(path))
+
+    def written(self, path):
+        # True once the latest bytes submitted for path are on disk
+        with self._cond:
+            return str(path) not in self._pending and str(path) not in self._failed
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stop:
+                    self._cond.wait()
+                if not self._pending: return
+                path = next(iter(self._pending))
+                raw = self._pending[path]
+                self._busy = path
+            ok = True
+            guard = self.guards.get(os.path.normpath(os.path.dirname(path)))
+            try:
+                with guard() if guard else nullcontext():
+                    mtime_ns = self._write(path, raw)
+            except Exception as e:
+                print("[save] write failed:", path, e); mtime_ns = None; ok = False
+            with self._cond:
+                if self._pending.get(path) is raw:
+                    del self._pending[path]
+                    if not ok: self._failed.add(path)
+                self._busy = None
+                self._cond.notify_all()
+            self.done.put((path, mtime_ns))
+
+    @traced("save")
+    def _write(self, path, raw):
+        if not raw:
+            try: os.remove(path)
+            except FileNotFoundError: pass
+            return None
+        tmp = path + ".tmp"
+        with open(tmp,"wb") as f:
+            f.write(raw); f.flush(); os.fsync(f.fileno())
+        os.replace(tmp, path)
+        try:
+            # make the rename itself durable (POSIX only)
+            fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+            try: os.fsync(fd)
+            finally: os.close(fd)
+        except OSError:
+            pass
+        return os.stat(path).st_mtime_ns
+
+    def flush(self, timeout=None):
+        # block until everything submitted so far is on disk
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and self._busy is None, timeout)
+
+    def stop(self):
+        self.flush()
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        self._thread.join(timeout=1.0)
+
+class SlotIndex:
+    """Metadata for every save slot, kept in saves/slots_index.json.
+
+    Entries are updated by Engine.write_slot, so menus never parse slot
+    files. The saves directory mtime is checked on each refresh(); only when
+    it moved (slot created/deleted/replaced outside write_slot) are the slot
+    files re-statted, and only files whose size/mtime changed are re-read.
+    The engine's own changes there (slot and side files, the index, the
+    journals) run inside own_change(), which adopts the mtime they leave
+    behind, so they don't cost a rescan.
+    With a SaveWriter, entries recorded before their file lands are marked
+    pending and left alone by rescans until the writer reports them done,
+    and the index file itself is only re-dumped by flush(), at most once a
+    frame however many entries changed.
+    """
+    FILENAME = "slots_index.json"
+
+    def __init__(self, saves_dir, writer=None):
+        self.saves_dir = str(saves_dir)
+        self.writer = writer
+        self.path = os.path.join(self.saves_dir, self.FILENAME)
+        self.entries = {}  # slot index -> {stage, unlocked, timestamp, size, checksum, mtime_ns}
+        self._dir_mtime = None
+        self._recent = None
+        self._ordered = {}  # sort key -> slot indices, rebuilt after changes
+        self.version = 0  # bumped whenever entries change
+        self._dirty = False  # entries changed since the last flush() (writer only)
+        self._stale = False  # the directory moved under us before one of our own changes
+        if writer is not None:
+            writer.guards[os.path.normpath(self.saves_dir)] = self.own_change
+        self._load()
+
+    def _dir_stat(self):
+        try: return os.stat(self.saves_dir).st_mtime_ns
+        except OSError: return None
+
+    @contextmanager
+    def own_change(self):
+        # wrap the engine's own file changes in the saves directory (any thread);
+        # a change by someone else since the last check still forces a rescan
+        if self._dir_stat() != self._dir_mtime: self._stale = True
+        try: yield
+        finally: self._dir_mtime = self._dir_stat()
+
+    def _load(self):
+        try:
+            with open(self.path,"r",encoding="utf-8") as f:
+                raw = json.load(f)
+            self.entries = {int(k):v for k,v in raw.get("slots",{}).items()}
+            for e in self.entries.values():
+                if e.pop("pending", False): e["mtime_ns"] = None  # may never have landed
+        except Exception:
+            self.entries = {}
+        self.rescan()
+
+    def _dump(self):
+        return json.dumps({"slots": {str(k):v for k,v in self.entries.items()}}).encode("utf-8")
+
+    def _save(self):
+        if self.writer is not None:
+            self._dirty = True
+            return
+        raw = self._dump()
+        tmp = self.path + ".tmp"
+        try:
+            with self.own_change():
+                with open(tmp,"wb") as f:
+                    f.write(raw)
+                os.replace(tmp, self.path)
+        except Exception as e:
+            print("[save] index write failed:", e)
+
+    def flush(self):
+        # once per frame: hand the index to the writer if it changed
+        if not self._dirty: return
+        self._dirty = False
+        self.writer.submit(self.path, self._dump())
+
+    def _drain_writes(self):
+        # apply SaveWriter completions for slot files (main thread)
+        if self.writer is None: return
+        changed = False
+        while True:
+            try: path,mtime_ns = self.writer.done.get_nowait()
+            except queue.Empty: break
+            m = SLOT_RE.match(os.path.basename(path))
+            e = self.entries.get(int(m.group(1))) if m else None
+            if e is None or not e.get("pending") or self.writer.pending(path) is not None:
+                continue
+            del e["pending"]; e["mtime_ns"] = mtime_ns; changed = True
+        if changed: self._save()
+
+    def _update_recent(self):
+        self._ordered = {}; self.version += 1
+        recent=None; recent_ts=0.0
+        for i,e in self.entries.items():
+            if e["timestamp"] and e["timestamp"] > recent_ts:
+                recent_ts = e["timestamp"]; recent = i
+        self._recent = recent
+
+    def rescan(self):
+        # stat slot files; re-read only ones that changed since they were indexed
+        seen = {}; dirty = False
+        self._stale = False; mtime = self._dir_stat()  # before the scan: later changes are seen next time
+        try:
+            it = list(os.scandir(self.saves_dir))
+        except OSError:
+            it = []
+        for de in it:
+            m = SLOT_RE.match(de.name)
+            if not m: continue
+            i = int(m.group(1)); st = de.stat()
+            e = self.entries.get(i)
+            if e and (e.get("pending") or (e.get("size") == st.st_size and e.get("mtime_ns") == st.st_mtime_ns)):
+                seen[i] = e; continue
+            try:
+                with open(de.path,"rb") as f: raw = f.read()
+                e = slot_info(json.loads(raw.decode("utf-8")))
+            except Exception:
+                continue
+            e.update(size=len(raw), checksum=hashlib.md5(raw).hexdigest(), mtime_ns=st.st_mtime_ns)
+            seen[i] = e; dirty = True
+        for i,e in self.entries.items():
+            if e.get("pending"): seen.setdefault(i, e)  # first write still in flight
+        self._dir_mtime = mtime
+        if dirty or seen.keys() != self.entries.keys():
+            self.entries = seen; self._save()
+        self._update_recent()
+
+    def refresh(self):
+        # O(1) when only the engine touched the saves directory
+        self._drain_writes()
+        if self._stale or self._dir_stat() != self._dir_mtime:
+            self.rescan()
+
+    def record(self, slot_index, data, raw, path, pending=False):
+        # called once slot_index was written (or queued, pending=True) with the serialised bytes raw
+        e = slot_info(data)
+        mtime_ns = None
+        if not pending:
+            try: mtime_ns = os.stat(path).st_mtime_ns
+            except OSError: pass
+        e.update(size=len(raw), checksum=hashlib.md5(raw).hexdigest(), mtime_ns=mtime_ns)
+        if pending: e["pending"] = True
+        self.entries[int(slot_index)] = e
+        self._save()
+        self._update_recent()
+
+    def get(self, slot_index):
+        self.refresh()
+        return self.entries.get(int(slot_index))
+
+    def ordered(self, sort="index"):
+        # existing slot indices, by slot number or most recent first
+        order = self._ordered.get(sort)
+        if order is None:
+            if sort == "recent":
+                order = sorted(self.entries, key=lambda i: (-self.entries[i]["timestamp"], i))
+            else:
+                order = sorted(self.entries)
+            self._ordered[sort] = order
+        return order
+
+    def next_free(self):
+        order = self.ordered("index")
+        for n,i in enumerate(order, 1):
+            if i != n: return n
+        return len(order) + 1
+
+    def most_recent(self):
+        self.refresh()
+        return self._recent
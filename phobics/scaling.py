@@ -0,0 +1,99 @@
+# phobics/scaling.py
+# Entity-count scaling benchmark. Synthetic stress stages (Engine.stress)
+# hold a fixed number of enemies or collectibles with deaths off; update and
+# draw are timed separately at each count, so the curve shows where the
+# per-entity Python work overtakes the fixed per-frame cost.
+#
+#   python -m phobics.scaling [--counts 10,100,...] [--series enemies,collectibles] [--out curve.json]
+import sys
+import json
+import time
+import random
+import argparse
+
+from .bench import SEED, SIZE, make_engine, close_engine, memory  # first: selects the headless SDL drivers
+from .perf import percentile
+import pygame
+
+COUNTS = (10, 100, 1000, 10000, 100000)
+OTHER = 10  # count of the entity kind not being swept
+BUDGET = 3.0  # seconds of measured frames per point, at least MIN_FRAMES
+MIN_FRAMES = 3
+
+def measure(engine, frames, budget=BUDGET):
+    # (update ms, draw ms) per frame, sorted
+    dt = 1.0/60
+    for _ in range(2):  # warm up caches and the surface pool
+        engine.update(dt); engine.screen.fill((0,0,0)); engine.draw()
+    update,draw = [],[]
+    deadline = time.perf_counter() + budget
+    while len(update) < frames and (len(update) < MIN_FRAMES or time.perf_counter() < deadline):
+        engine.begin_frame()
+        t0 = time.perf_counter()
+        engine.update(dt)
+        t1 = time.perf_counter()
+        engine.screen.fill((0,0,0)); engine.draw(); pygame.display.flip()
+        t2 = time.perf_counter()
+        engine.end_frame()
+        update.append((t1 - t0)*1000.0); draw.append((t2 - t1)*1000.0)
+    return sorted(update), sorted(draw)
+
+def point(engine, series, count, frames):
+    from . import scenes
+    random.seed(SEED)
+    n_enemies = count if series == "enemies" else OTHER
+    n_collect = count if series == "collectibles" else OTHER
+    engine.stress = {"enemies": n_enemies, "collectibles": n_collect}
+    engine.stage = 1; engine.reset_stage()
+    engine.scenes.reset(scenes.Gameplay(engine))
+    update,draw = measure(engine, frames)
+    u = sum(update)/len(update); d = sum(draw)/len(draw)
+    return {
+        "count": count, "frames": len(update),
+        "update_ms": u, "update_p95_ms": percentile(update, 95),
+        "draw_ms": d, "draw_p95_ms": percentile(draw, 95),
+        "update_us_per_entity": u*1000.0/count, "draw_us_per_entity": d*1000.0/count,
+        "rss_bytes": memory()[0],
+    }
+
+def run(counts=COUNTS, series=("enemies", "collectibles"), frames=120, size=SIZE):
+    engine = make_engine(size)
+    curves = {}
+    try:
+        for s in series:
+            curve = curves[s] = []
+            for count in counts:
+                p = point(engine, s, count, frames)
+                # share of the frame spent on entities beyond the smallest count
+                base = curve[0] if curve else p
+                total = p["update_ms"] + p["draw_ms"]
+                p["entity_share"] = max(0.0, 1.0 - (base["update_ms"] + base["draw_ms"])/total) if total else 0.0
+                curve.append(p)
+                print(f"[scaling] {s:<12} {count:>7}  update {p['update_ms']:9.3f} ms ({p['update_us_per_entity']:7.3f} us/entity)  "
+                      f"draw {p['draw_ms']:9.3f} ms ({p['draw_us_per_entity']:7.3f} us/entity)  entities {p['entity_share']:.0%}",
+                      file=sys.stderr)
+    finally:
+        engine.stress = None
+        close_engine(engine)
+    return {"seed": SEED, "size": list(size), "other": OTHER, "time": time.time(), "series": curves}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m phobics.scaling")
+    ap.add_argument("--counts", default=",".join(map(str, COUNTS)), help="comma-separated entity counts")
+    ap.add_argument("--series", default="enemies,collectibles", help="which entity kinds to sweep")
+    ap.add_argument("--frames", type=int, default=120, help="measured frames per point (fewer if over %.0f s)" % BUDGET)
+    ap.add_argument("--out", help="also write the JSON here")
+    args = ap.parse_args(argv)
+    counts = [int(c) for c in args.counts.split(",") if c]
+    series = [s for s in args.series.split(",") if s]
+    bad = [s for s in series if s not in ("enemies", "collectibles")]
+    if bad: ap.error("unknown series: " + ", ".join(bad))
+    report = run(counts, series, args.frames)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f: f.write(text)
+    print(text)
+    return report
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+# phobics/scenes.py
+from .controls import KEY_ACTIONS, HOTKEY_ACTIONS
+
+class Scene:
+    """One screen of the game (title, a menu, gameplay...).
+
+    Only the top scene of the SceneStack is updated and gets input. A
+    transparent scene also shows the scene beneath it; that scene is frozen
+    while covered, so it is drawn once more (its own layer only, nothing
+    the engine draws on top) and that render is cached and blitted.
+    """
+    transparent = False
+    ACTIONS = {}  # action name (see controls.py) -> handler method name
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.frame = None  # cached render while covered by a transparent scene
+        self.handlers = {a: getattr(self, m) for a,m in self.ACTIONS.items()}
+
+    def enter(self): pass
+    def resume(self): self.enter()  # revealed again by a pop
+    def exit(self): pass
+    def panel(self): return None  # widgets.Panel this scene draws and hit-tests
+
+    def update(self, dt):
+        p = self.panel()
+        if p is not None: p.hover(self.engine.aim_pos)
+    def draw(self): pass
+
+    def handle_action(self, action, ev):
+        # False when this scene has no handler for the action
+        fn = self.handlers.get(action)
+        if fn is None: return False
+        fn(ev)
+        return True
+
+class SceneStack:
+    def __init__(self):
+        self.scenes = []
+
+    @property
+    def top(self):
+        return self.scenes[-1] if self.scenes else None
+
+    def push(self, scene):
+        self.scenes.append(scene)
+        scene.enter()
+        return scene
+
+    def pop(self):
+        if not self.scenes: return None
+        scene = self.scenes.pop(); scene.exit()
+        if self.top is not None:
+            self.top.frame = None
+            self.top.resume()
+        return scene
+
+    def replace(self, scene):
+        if self.scenes: self.scenes.pop().exit()
+        self.scenes.append(scene)
+        scene.enter()
+        return scene
+
+    def reset(self, scene):
+        while self.scenes: self.scenes.pop().exit()
+        self.scenes.append(scene)
+        scene.enter()
+        return scene
+
+    def update(self, dt):
+        if self.scenes: self.scenes[-1].update(dt)
+
+    def visible(self):
+        # the top scene and the scenes it shows through to, bottom first
+        i = len(self.scenes) - 1
+        while i > 0 and self.scenes[i].transparent: i -= 1
+        return self.scenes[i:]
+
+    def draw(self, screen):
+        # lowest visible scene first; covered ones serve their cached frame
+        for scene in self.visible():
+            if scene is self.top:
+                scene.draw()
+            elif scene.frame is not None:
+                screen.blit(scene.frame, (0,0))
+            else:
+                scene.draw(); scene.frame = screen.copy()  # first frame covered
+
+    def handle_action(self, action, ev):
+        return self.top.handle_action(action, ev) if self.scenes else False
+
+class Title(Scene):
+    # any key or click advances, except the hotkeys that keep their meaning
+    ACTIONS = dict.fromkeys((a for a in KEY_ACTIONS + ("click",) if a not in HOTKEY_ACTIONS), "advance")
+
+    def draw(self): self.engine.draw_title_screen()
+    def advance(self, ev): self.engine.scenes.replace(FrontMenu(self.engine))
+
+class FrontMenu(Scene):
+    ACTIONS = {"confirm": "new_game", "back": "back", "click": "click"}
+    LABELS = {"New Game": "open_new_game_slot_menu", "Continue": "continue_most_recent", "Load": "open_load_slot_menu",
+              "Options": "open_options", "Back": "back_to_title", "Quit": "quit_game"}
+
+    def enter(self): self.engine.build_front_menu()
+    def panel(self): return self.engine.front_menu_ui
+    def draw(self): self.engine.draw_front_menu()
+    def new_game(self, ev): self.engine.open_new_game_slot_menu()
+    def back(self, ev): self.engine.back_to_title()
+
+    def click(self, ev):
+        b = self.engine.front_menu_ui.hit(ev.pos)
+        if b is None: return
+        self.engine.play_select_sound()
+        getattr(self.engine, self.LABELS[b.label])()
+
+class SlotMenu(Scene):
+    # typing filters the list, so printable bound keys (r, space) are text here too
+    ACTIONS = {"back": "back", "page_prev": "page_prev", "page_next": "page_next", "erase": "erase",
+               "text": "type", "reload": "type", "fire": "type", "click": "click"}
+
+    def __init__(self, engine, mode):
+        super().__init__(engine)
+        self.mode = mode
+
+    def enter(self):
+        e = self.engine
+        e.slot_menu_mode = self.mode; e.selected_slot = None
+        e.reset_slot_browser(); e.build_slot_buttons()
+
+    def resume(self):
+        self.engine.slot_menu_mode = self.mode; self.engine.build_slot_buttons()
+
+    def exit(self): self.engine.slot_menu_mode = None
+    def panel(self): return self.engine.slot_ui
+    def draw(self): self.engine.draw_slot_menu()
+    def back(self, ev): self.engine.scenes.pop()
+
+    def page_prev(self, ev):
+        if self.engine.slot_page > 0: self.engine.slot_menu_action("prev")
+
+    def page_next(self, ev):
+        if self.engine.slot_page < self.engine.slot_pages()[1]-1: self.engine.slot_menu_action("next")
+
+    def erase(self, ev): self.engine.set_slot_query(self.engine.slot_query[:-1])
+
+    def type(self, ev):
+        if ev.unicode and ev.unicode.isprintable(): self.engine.set_slot_query(self.engine.slot_query + ev.unicode)
+
+    def click(self, ev):
+        e = self.engine
+        b = e.slot_ui.hit(ev.pos)
+        if b is None: return
+        idx = b.action
+        if idx == 0: e.scenes.pop(); return
+        if idx in ("prev","next","sort"):
+            e.play_select_sound(); e.slot_menu_action(idx); return
+        e.selected_slot = idx
+        if self.mode == "new": e.scenes.push(StageSelect(e, idx))
+        elif self.mode == "load": e.load_from_slot(idx)
+        elif self.mode == "save": e.save_to_slot(idx)
+
+class StageSelect(Scene):
+    ACTIONS = {"back": "back", "click": "click"}
+
+    def __init__(self, engine, slot_index):
+        super().__init__(engine)
+        self.slot_index = slot_index
+
+    def enter(self): self.engine.build_stage_buttons_for_slot(self.slot_index, mode="new")
+    def panel(self): return self.engine.stage_ui
+    def draw(self): self.engine.draw_stage_select()
+    def back(self, ev): self.engine.scenes.pop()
+
+    def click(self, ev):
+        b = self.engine.stage_ui.hit(ev.pos)  # locked stages are disabled buttons
+        if b is None: return
+        if b.action == -1: self.engine.scenes.pop()
+        else: self.engine.start_new_game(int(b.action))
+
+class Gameplay(Scene):
+    ACTIONS = {"back": "menu", "fire": "fire", "click": "fire", "quicksave": "quicksave", "quickload": "quickload"}
+
+    def update(self, dt): self.engine.update_world(dt)
+    def draw(self): self.engine.draw_world(); self.engine.draw_hud()
+    def menu(self, ev): self.engine.open_menu()
+    def quicksave(self, ev): self.engine.quicksave()
+    def quickload(self, ev): self.engine.quickload()
+
+    def fire(self, ev):
+        e = self.engine
+        if hasattr(ev, "pos"): e.aim(ev.pos)
+        if e.shot_available: e.fire_projectile(*e.aim_world)
+
+class PauseMenu(Scene):
+    ACTIONS = {"back": "back", "click": "click"}
+    LABELS = {"Continue": "close_menu", "Save Game": "open_save_slot_menu", "Load Game": "open_load_slot_menu",
+              "Restart": "restart_game", "Options": "open_options", "Quit": "quit_game"}
+
+    def enter(self): self.engine.build_menu()
+    def panel(self): return self.engine.menu_ui
+    def draw(self): self.engine.draw_pause_menu()
+    def back(self, ev): self.engine.close_menu()
+
+    def click(self, ev):
+        b = self.engine.menu_ui.hit(ev.pos)
+        if b is None: return
+        self.engine.play_select_sound()
+        getattr(self.engine, self.LABELS[b.label])()
+
+class Options(Scene):
+    ACTIONS = {"back": "ignore", "click": "click"}
+
+    def enter(self): self.engine.build_options_menu()
+    def panel(self): return self.engine.options_ui
+    def draw(self): self.engine.draw_options()
+    def ignore(self, ev): pass
+
+    def click(self, ev):
+        if self.engine.options_ui.hit(ev.pos) is not None:
+            self.engine.play_select_sound(); self.engine.close_options()
+
+class Shop(Scene):
+    # drawn over the frozen gameplay frame
+    transparent = True
+    ACTIONS = {"back": "menu", "click": "click"}
+
+    def enter(self): self.engine.build_shop_buttons()
+    def panel(self): return self.engine.shop_ui
+    def draw(self): self.engine.draw_shop()
+    def menu(self, ev): self.engine.open_menu()  # Continue comes back to the shop
+
+    def click(self, ev):
+        e = self.engine
+        b = e.shop_ui.hit(ev.pos)
+        if b is None: return
+        if b.action == "leave":
+            e.play_select_sound(); e.close_shop()
+        elif e.apply_shop_item(b.action):
+            e.play_select_sound()
@@ -1,14 +1,26 @@
 # phobics/settings.py
 import os
+import sys
 from pathlib import Path
 
+from .utils import resource_path
+
 HERE = Path(__file__).resolve().parent.parent
 ASSETS = HERE / "assets"
 TEX_DIR = ASSETS / "textures"
 SND_DIR = ASSETS / "sounds"
 MUSIC_DIR = ASSETS / "music"
 STAGES_JSON = ASSETS / "stages.json"
-SAVES_DIR = HERE / "saves"
+BAKED_DIR = ASSETS / "baked"  # output of `python -m phobics.bake`
+SAVES_DIR = Path(os.environ.get("PHOBICS_SAVES_DIR") or HERE / "saves")  # benchmarks point this at a temp dir
+CACHE_DIR = HERE / "cache"
+TRACE_DIR = HERE / "traces"  # F4 trace dumps, see phobics/trace.py
+PROFILE_DIR = HERE / "profiles"  # --profile collapsed stacks, see phobics/sampler.py
+BENCH_DIR = HERE / "benchmarks"  # benchmark history, see phobics/regress.py
+# flight recorder ring (phobics/flight.py); frozen builds keep it next to the exe, not in the unpack dir
+FLIGHT_DIR = (Path(sys.executable).parent if getattr(sys, "frozen", False) else CACHE_DIR) / "flight"
+# packed archive built by `python -m phobics.pack` (bundled next to assets/ in releases)
+ASSET_PACK = Path(resource_path("assets.pak"))
 
 # Ensure saves folder exists
 os.makedirs(SAVES_DIR, exist_ok=True)
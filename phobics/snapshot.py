@@ -0,0 +1,104 @@
+# phobics/snapshot.py
+# Binary world snapshot used by quicksave/quickload.
+#
+#   header   PHSN, version, scalar block (_STATE)
+#   unlocked u16 count + u16[]
+#   enemies  u32 count + i32[4n] rects + f64[2n] velocities
+#   collect  u32 count + i32[4n] rects
+#
+# Version 1 is the JSON slot format ({"stage", "unlocked", "timestamp"});
+# decode() migrates it to a state without entities, which restore re-rolls.
+import json
+import struct
+from array import array
+
+MAGIC = b"PHSN"
+VERSION = 2
+_HEAD = struct.Struct("<4sH")
+_STATE = struct.Struct("<HidBBdd iiii B iiii dd dd ii")
+_COUNT = struct.Struct("<I")
+
+def encode(state):
+    proj = state.get("projectile")
+    pr = tuple(proj) if proj else (0,0,0,0)
+    pv = state.get("projectile_v") or (0.0,0.0)
+    out = [_HEAD.pack(MAGIC, VERSION), _STATE.pack(
+        state["stage"], state["money"], state["timestamp"],
+        state["shot_available"], state["shield"],
+        state["player_speed_multiplier"], state["enemy_speed_multiplier"],
+        *state["player"],
+        1 if proj else 0, *pr, float(pv[0]), float(pv[1]),
+        float(state["arrow_end"][0]), float(state["arrow_end"][1]),
+        state["world_w"], state["world_h"])]
+    unlocked = state["unlocked"]
+    out.append(_COUNT.pack(len(unlocked))); out.append(array("H", unlocked).tobytes())
+    enemies = state["enemies"]
+    out.append(_COUNT.pack(len(enemies)))
+    out.append(array("i", [v for r,_,_ in enemies for v in r]).tobytes())
+    out.append(array("d", [v for _,vx,vy in enemies for v in (vx,vy)]).tobytes())
+    collect = state["collectibles"]
+    out.append(_COUNT.pack(len(collect)))
+    out.append(array("i", [v for r in collect for v in r]).tobytes())
+    return b"".join(out)
+
+def _read_array(code, raw, pos, n):
+    a = array(code)
+    end = pos + n*a.itemsize
+    a.frombytes(raw[pos:end])
+    return a, end
+
+def decode(raw):
+    """State dict from snapshot bytes (any supported version).
+
+    Rects come back as (x, y, w, h) tuples and enemies as [rect, vx, vy];
+    a state with "enemies" set to None has no world to restore.
+    """
+    if raw[:1] == b"{":
+        return migrate_v1(json.loads(raw.decode("utf-8")))
+    magic,version = _HEAD.unpack_from(raw, 0)
+    if magic != MAGIC:
+        raise ValueError("not a snapshot")
+    if version != VERSION:
+        raise ValueError(f"unsupported snapshot version {version}")
+    pos = _HEAD.size
+    v = _STATE.unpack_from(raw, pos); pos += _STATE.size
+    state = {
+        "version": version,
+        "stage": v[0], "money": v[1], "timestamp": v[2],
+        "shot_available": bool(v[3]), "shield": bool(v[4]),
+        "player_speed_multiplier": v[5], "enemy_speed_multiplier": v[6],
+        "player": v[7:11],
+        "projectile": v[12:16] if v[11] else None,
+        "projectile_v": (v[16], v[17]),
+        "arrow_end": (v[18], v[19]),
+        "world_w": v[20], "world_h": v[21],
+    }
+    (n,) = _COUNT.unpack_from(raw, pos); pos += _COUNT.size
+    unlocked,pos = _read_array("H", raw, pos, n)
+    state["unlocked"] = list(unlocked)
+    (n,) = _COUNT.unpack_from(raw, pos); pos += _COUNT.size
+    rects,pos = _read_array("i", raw, pos, 4*n)
+    vel,pos = _read_array("d", raw, pos, 2*n)
+    vel = [int(x) if x.is_integer() else x for x in vel]  # keep the ints reset_stage rolls
+    it = iter(rects); vit = iter(vel)
+    state["enemies"] = [[r, vx, vy] for r,vx,vy in zip(zip(it,it,it,it), vit, vit)]
+    (n,) = _COUNT.unpack_from(raw, pos); pos += _COUNT.size
+    rects,pos = _read_array("i", raw, pos, 4*n)
+    it = iter(rects)
+    state["collectibles"] = list(zip(it,it,it,it))
+    return state
+
+def migrate_v1(data):
+    # JSON slot save -> snapshot state; the world is re-rolled on restore
+    stage = int(data.get("stage",1))
+    return {
+        "version": 1,
+        "stage": stage, "money": int(data.get("money",0)), "timestamp": float(data.get("timestamp",0.0)),
+        "shot_available": True, "shield": bool(data.get("shield",False)),
+        "player_speed_multiplier": float(data.get("player_speed_multiplier",1.0)),
+        "enemy_speed_multiplier": float(data.get("enemy_speed_multiplier",1.0)),
+        "unlocked": sorted(set(int(x) for x in data.get("unlocked",[1]))),
+        "player": None, "projectile": None, "projectile_v": (0.0,0.0), "arrow_end": None,
+        "world_w": None, "world_h": None,
+        "enemies": None, "collectibles": None,
+    }
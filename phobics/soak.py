@@ -0,0 +1,198 @@
+# phobics/soak.py
+# Long-run soak test for kiosk installs. Runs the headless engine for many
+# frames while a fixed schedule clears stages, dies, visits the shop and the
+# pause menu, saves/loads slots and quicksaves, and reloads assets
+# (SafeLoader.reload_all). Every SAMPLE_EVERY frames it records RSS, live
+# Surfaces and Sounds, open file handles and busy mixer channels; after the
+# warmup a metric fails when it keeps growing: the last quarter's median is
+# above the first quarter's by more than its limit and the trend over the
+# second half still adds half the limit (a one-off step to a plateau passes).
+#
+#   python -m phobics.soak [--frames 300000] [--sample-every 1000] [--size WxH] [--out soak.json]
+import os
+import gc
+import sys
+import json
+import time
+import random
+import argparse
+
+from .bench import SEED, make_engine, close_engine, memory, step, parse_size  # first: selects the headless SDL drivers
+import pygame
+
+FRAMES = 300000
+SAMPLE_EVERY = 1000
+SIZE = (640, 480)  # the draw path is the same at any size; smaller runs more frames per hour
+WARMUP = 12000  # frames ignored: one new_game cycle opens every font, cache and pool entry
+# allowed growth, last quarter median over first quarter median
+LIMITS = {"rss_mb": 16.0, "surfaces": 16, "sounds": 4, "files": 4, "busy_channels": 4}
+# action -> every N frames
+SCHEDULE = {
+    "death": 450,
+    "clear": 700,
+    "menu": 2000,
+    "quicksave": 1500,
+    "save_load": 3000,
+    "reload": 5000,
+    "new_game": 12000,
+}
+
+def live_objects(*roots):
+    # Surfaces and Sounds aren't tracked by gc, and GcPolicy freezes most of the
+    # heap out of gc.get_objects(); walk everything reachable from the modules and roots
+    surfaces = set(); sounds = set()
+    Surface, Sound = pygame.Surface, pygame.mixer.Sound
+    seen = set(); todo = [sys.modules, *roots] + gc.get_objects()
+    while todo:
+        obj = todo.pop()
+        if id(obj) in seen: continue
+        seen.add(id(obj))
+        if isinstance(obj, Surface): surfaces.add(id(obj))
+        elif isinstance(obj, Sound): sounds.add(id(obj))
+        todo.extend(gc.get_referents(obj))
+    return len(surfaces), len(sounds)
+
+def open_files():
+    for d in ("/proc/self/fd", "/dev/fd"):
+        try: return len(os.listdir(d))
+        except OSError: pass
+    try:
+        import psutil
+        p = psutil.Process()
+        return p.num_handles() if sys.platform == "win32" else p.num_fds()
+    except Exception:
+        return None
+
+def busy_channels():
+    if not pygame.mixer.get_init(): return None
+    return sum(1 for i in range(pygame.mixer.get_num_channels()) if pygame.mixer.Channel(i).get_busy())
+
+def sample(frame, engine):
+    surfaces,sounds = live_objects(engine)
+    rss = memory()[0]
+    return {"frame": frame, "time": time.time(), "rss_mb": rss/2**20 if rss is not None else None,
+            "surfaces": surfaces, "sounds": sounds, "files": open_files(), "busy_channels": busy_channels()}
+
+def slope(xs, ys):
+    n = len(xs); mx = sum(xs)/n; my = sum(ys)/n
+    var = sum((x - mx)**2 for x in xs)
+    return sum((x - mx)*(y - my) for x,y in zip(xs, ys))/var if var else 0.0
+
+def median(values):
+    v = sorted(values)
+    return v[len(v)//2]
+
+def verdicts(samples):
+    # metric -> {growth, slope per 100k frames, limit, ok}
+    keep = [s for s in samples if s["frame"] > WARMUP]
+    out = {}
+    for metric,limit in LIMITS.items():
+        pts = [(s["frame"], s[metric]) for s in keep if s[metric] is not None]
+        if len(pts) < 8:
+            out[metric] = {"ok": True, "note": "not enough samples"}; continue
+        q = len(pts)//4
+        first = median([y for _,y in pts[:q]]); last = median([y for _,y in pts[-q:]])
+        per = slope([x for x,_ in pts], [y for _,y in pts])*100000
+        half = pts[len(pts)//2:]
+        late = slope([x for x,_ in half], [y for _,y in half])*(half[-1][0] - half[0][0])
+        growth = last - first
+        out[metric] = {"first": first, "last": last, "growth": growth, "late_growth": late, "slope_per_100k": per,
+                       "limit": limit, "ok": not (growth > limit and late > limit/2)}
+    return out
+
+class Driver:
+    """Plays the SCHEDULE, one due action per gameplay frame; the shop and
+    pause menu are left again after 60 frames."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.counts = dict.fromkeys(SCHEDULE, 0)
+        self.due = []  # actions waiting for gameplay to be on top
+        self._close_at = None  # frame to leave the current shop/pause menu
+
+    def tick(self, frame):
+        from . import scenes
+        e = self.engine
+        self.due += [a for a,every in SCHEDULE.items() if frame % every == 0]
+        top = e.scenes.top
+        if isinstance(top, (scenes.Shop, scenes.PauseMenu)):
+            if self._close_at is None: self._close_at = frame + 60
+            if frame >= self._close_at:
+                self._close_at = None
+                if isinstance(top, scenes.Shop): e.close_shop()  # leave: next stage
+                else: e.handle_action("back", None)  # PauseMenu: continue
+            return
+        if not isinstance(top, scenes.Gameplay) or not self.due: return
+        action = self.due.pop(0)  # one per frame
+        getattr(self, action)(); self.counts[action] += 1
+
+    def death(self):
+        e = self.engine
+        if e.enemies: e.enemies[0][0].center = e.player.center  # update_world restarts the stage
+
+    def clear(self):
+        self.engine.collectibles.clear()  # next update advances the stage or opens the shop
+
+    def menu(self):
+        self.engine.open_menu()
+
+    def quicksave(self):
+        self.engine.quicksave(); self.engine.save_writer.flush(); self.engine.quickload()
+
+    def save_load(self):
+        e = self.engine
+        e.save_to_slot(1); e.save_writer.flush(); e.load_from_slot(1)
+
+    def reload(self):
+        self.engine.reload_assets()
+
+    def new_game(self):
+        self.engine.selected_slot = None; self.engine.start_new_game(1)
+
+def run(frames=FRAMES, every=SAMPLE_EVERY, size=SIZE):
+    random.seed(SEED)
+    engine = make_engine(size)
+    samples = []
+    driver = Driver(engine)
+    t0 = time.perf_counter()
+    try:
+        engine.selected_slot = None; engine.start_new_game(1)
+        for frame in range(1, frames+1):
+            driver.tick(frame)
+            step(engine)
+            if frame % every == 0:
+                samples.append(sample(frame, engine))
+                s = samples[-1]
+                print(f"[soak] frame {frame:>7}  rss {s['rss_mb'] or 0:7.1f} MB  surfaces {s['surfaces']:5}  sounds {s['sounds']:3}  "
+                      f"files {s['files']}  busy channels {s['busy_channels']}  stage {engine.stage}", file=sys.stderr)
+    finally:
+        close_engine(engine)
+    result = verdicts(samples)
+    return {
+        "seed": SEED, "frames": frames, "size": list(size), "seconds": time.perf_counter() - t0,
+        "actions": driver.counts, "ok": all(v["ok"] for v in result.values()),
+        "verdicts": result, "samples": samples,
+    }
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m phobics.soak")
+    ap.add_argument("--frames", type=int, default=FRAMES)
+    ap.add_argument("--sample-every", type=int, default=SAMPLE_EVERY, help="frames between resource samples")
+    ap.add_argument("--size", type=parse_size, default=SIZE, help="window size, WxH")
+    ap.add_argument("--out", help="also write the JSON report here")
+    args = ap.parse_args(argv)
+    report = run(args.frames, args.sample_every, args.size)
+    text = json.dumps(report, indent=1)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f: f.write(text)
+    for metric,v in report["verdicts"].items():
+        if "growth" in v:
+            print(f"{metric:<14} {v['first']:10.1f} -> {v['last']:10.1f}  ({v['slope_per_100k']:+.1f} per 100k frames)  "
+                  f"{'ok' if v['ok'] else 'LEAK'}")
+        else:
+            print(f"{metric:<14} {v.get('note','')}")
+    print("[soak]", "passed" if report["ok"] else "FAILED: resource growth past the limits above")
+    return 0 if report["ok"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+# phobics/surfpool.py
+# Scratch surfaces for per-frame drawing. SurfacePool hands out reusable
+# surfaces keyed by (size, flags); Engine.draw recycles everything handed
+# out during the previous draw, so steady-state frames construct no
+# Surfaces. SurfaceCounter counts the Surfaces the engine's draw paths
+# build while it is active (benchmarks, debugging).
+import pygame
+
+class SurfacePool:
+    def __init__(self):
+        self._free = {}  # (size, flags) -> [Surface]
+        self._used = []  # (key, surface) handed out since recycle()
+        self.allocs = 0  # surfaces the pool had to create
+        self.hits = 0
+
+    def get(self, size, flags=0):
+        # contents are whatever the previous user drew; callers fill what they need
+        key = (tuple(size), flags)
+        free = self._free.get(key)
+        if free:
+            surf = free.pop(); self.hits += 1
+        else:
+            surf = pygame.Surface(key[0], flags); self.allocs += 1
+        self._used.append((key, surf))
+        return surf
+
+    def recycle(self):
+        for key,surf in self._used:
+            self._free.setdefault(key, []).append(surf)
+        self._used.clear()
+
+    def clear(self):
+        # after a resolution change the old sizes don't come back
+        self._free.clear(); self._used.clear()
+
+class SurfaceCounter:
+    """Counts Surfaces built by the engine's own draw paths inside a with block.
+
+    Each builder in SITES is wrapped and counts the Surfaces one call added
+    (pool misses, panel/button/HUD/perf overlay composes); transform.scale /
+    smoothscale calls without a destination surface are counted too.
+    pygame.Surface itself is left alone, so isinstance checks and drawing
+    behave exactly as outside the block. One-off builders (atlas, loader
+    fallbacks), copies and font renders are not seen.
+    """
+
+    @staticmethod
+    def sites():
+        # (class, method, obj -> running build count)
+        from .widgets import Button, Panel
+        from .hud import Hud
+        from .perf import PerfOverlay
+        return [
+            (SurfacePool, "get", lambda pool: pool.allocs),
+            (Panel, "render", lambda panel: panel.renders),
+            (Button, "render", lambda button: len(button._surfs)),
+            (Hud, "_compose", lambda hud: hud.renders),
+            (PerfOverlay, "_render", lambda overlay: overlay.renders),
+        ]
+
+    def __init__(self):
+        self.count = 0
+        self._saved = None
+
+    def __enter__(self):
+        counter = self
+        def counted_method(fn, built):
+            def wrap(obj, *a, **kw):
+                n = built(obj)
+                try: return fn(obj, *a, **kw)
+                finally: counter.count += max(0, built(obj) - n)
+            return wrap
+        def counted(fn):
+            def wrap(surf, size, *dest, **kw):
+                if not dest and "dest_surface" not in kw: counter.count += 1
+                return fn(surf, size, *dest, **kw)
+            return wrap
+        sites = self.sites()
+        self._saved = ([(cls, name, cls.__dict__[name]) for cls,name,_ in sites],
+                       pygame.transform.scale, pygame.transform.smoothscale)
+        for cls,name,built in sites:
+            setattr(cls, name, counted_method(cls.__dict__[name], built))
+        pygame.transform.scale = counted(pygame.transform.scale)
+        pygame.transform.smoothscale = counted(pygame.transform.smoothscale)
+        return self
+
+    def __exit__(self, *exc):
+        methods, pygame.transform.scale, pygame.transform.smoothscale = self._saved
+        for cls,name,fn in methods: setattr(cls, name, fn)
+        return False
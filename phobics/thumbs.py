@@ -0,0 +1,75 @@
+# phobics/thumbs.py
+import io
+import queue
+import threading
+from collections import OrderedDict
+import pygame
+
+THUMB_SIZE = (72, 54)
+
+class ThumbnailWorker:
+    """Downscales and PNG-encodes save thumbnails off the main thread.
+
+    submit() takes a surface the caller already copied (so the frame thread
+    pays for one copy only); the encoded bytes go to the SaveWriter. A None
+    surface removes the thumbnail, in order with the encodes before it.
+    """
+
+    def __init__(self, writer, size=THUMB_SIZE):
+        self.writer = writer
+        self.size = size
+        self.jobs = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="phobics-thumbnails", daemon=True)
+        self._thread.start()
+
+    def submit(self, surf, path):
+        self.jobs.put((surf, str(path)))
+
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None: return
+            surf,path = job
+            try:
+                if surf is None:
+                    self.writer.submit(path, b""); continue  # empty bytes: remove
+                small = pygame.transform.smoothscale(surf, self.size)
+                buf = io.BytesIO()
+                pygame.image.save(small, buf, "thumb.png")
+                self.writer.submit(path, buf.getvalue())
+            except Exception as e:
+                print("[save] thumbnail failed:", e)
+            finally:
+                self.jobs.task_done()
+
+    def flush(self):
+        self.jobs.join()
+
+    def stop(self):
+        self.flush()
+        self.jobs.put(None)
+        self._thread.join(timeout=1.0)
+
+class ThumbnailCache:
+    """Bounded LRU of decoded thumbnails; load(key) is only called on a miss."""
+
+    def __init__(self, capacity):
+        self.capacity = max(1, int(capacity))
+        self._items = OrderedDict()
+        self.decodes = 0
+
+    def get(self, key, load):
+        if key in self._items:
+            self._items.move_to_end(key)
+            return self._items[key]
+        surf = load()
+        self.decodes += 1
+        self._items[key] = surf
+        while len(self._items) > self.capacity:
+            self._items.popitem(last=False)
+        return surf
+
+    def resize(self, capacity):
+        self.capacity = max(1, int(capacity))
+        while len(self._items) > self.capacity:
+            self._items.popitem(last=False)
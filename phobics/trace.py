@@ -0,0 +1,112 @@
+# phobics/trace.py
+# Chrome/Perfetto trace events ("X" complete events) in a preallocated ring
+# buffer. Recording is off unless started with --trace / PHOBICS_TRACE; F4
+# dumps the last TRACE_SECONDS to traces/ (open in ui.perfetto.dev or
+# chrome://tracing).
+import os
+import json
+import time
+import threading
+import functools
+from array import array
+
+from .settings import TRACE_DIR
+
+TRACE_SECONDS = 10.0
+
+class Tracer:
+    def __init__(self, capacity=1 << 16):
+        self.capacity = capacity
+        self.enabled = False
+        self._name = [None]*capacity
+        self._cat = [None]*capacity
+        self._args = [None]*capacity
+        self._ts = array("d", bytes(8*capacity))  # start, perf_counter seconds
+        self._dur = array("d", bytes(8*capacity))
+        self._tid = array("q", bytes(8*capacity))
+        self._n = 0  # events written so far; slot is _n % capacity
+        self._lock = threading.Lock()
+        self._threads = {}
+
+    def start(self):
+        self.enabled = True
+        return self
+
+    def complete(self, name, cat, start, end, args=None):
+        # start/end are time.perf_counter() values
+        tid = threading.get_ident()
+        with self._lock:
+            i = self._n % self.capacity; self._n += 1
+            self._name[i] = name; self._cat[i] = cat; self._args[i] = args
+            self._ts[i] = start; self._dur[i] = end - start; self._tid[i] = tid
+            if tid not in self._threads: self._threads[tid] = threading.current_thread().name
+
+    def span(self, name, cat="engine", args=None):
+        return _Span(self, name, cat, args) if self.enabled else _NULL
+
+    def events(self, seconds=None):
+        # oldest first, optionally only the ones that ended in the last `seconds`
+        with self._lock:
+            n = self._n; first = max(0, n - self.capacity)
+            slots = [i % self.capacity for i in range(first, n)]
+            rows = [(self._name[i], self._cat[i], self._args[i], self._ts[i], self._dur[i], self._tid[i]) for i in slots]
+            threads = dict(self._threads)
+        if seconds is not None:
+            cutoff = time.perf_counter() - seconds
+            rows = [r for r in rows if r[3] + r[4] >= cutoff]
+        return rows, threads
+
+    def dump(self, path=None, seconds=TRACE_SECONDS):
+        rows, threads = self.events(seconds)
+        pid = os.getpid()
+        out = [{"ph": "M", "name": "thread_name", "pid": pid, "tid": tid, "args": {"name": name}} for tid,name in threads.items()]
+        for name,cat,args,ts,dur,tid in rows:
+            ev = {"ph": "X", "name": name, "cat": cat, "pid": pid, "tid": tid, "ts": round(ts*1e6, 3), "dur": round(dur*1e6, 3)}
+            if args: ev["args"] = args
+            out.append(ev)
+        if path is None:
+            os.makedirs(TRACE_DIR, exist_ok=True)
+            path = os.path.join(TRACE_DIR, time.strftime("trace-%Y%m%d-%H%M%S.json"))
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": out, "displayTimeUnit": "ms"}, f)
+        print(f"[trace] wrote {len(rows)} events to {path}")
+        return path
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "args", "t0")
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer; self.name = name; self.cat = cat; self.args = args
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.complete(self.name, self.cat, self.t0, time.perf_counter(), self.args)
+        return False
+
+class _NullSpan:
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+_NULL = _NullSpan()
+
+# process-wide tracer; modules record through it when it is enabled
+TRACER = Tracer()
+
+def span(name, cat="engine", args=None):
+    return TRACER.span(name, cat, args)
+
+def traced(cat):
+    # decorator: one span per call, named after the function; a str first argument goes in args
+    def wrap(fn):
+        name = fn.__qualname__
+        @functools.wraps(fn)
+        def inner(*a, **kw):
+            if not TRACER.enabled: return fn(*a, **kw)
+            arg = next((x for x in a if isinstance(x, str)), None)
+            with TRACER.span(name, cat, {"arg": arg} if arg else None):
+                return fn(*a, **kw)
+        return inner
+    return wrap
@@ -2,7 +2,17 @@
 import pygame
 from pygame import Rect
 
-# helper builders that return lists used by Engine (kept similar to original)
+from .widgets import ButtonStyle
+
+# helper builders that return lists used by Engine (kept similar to original);
+# Engine turns them into widgets.Panel trees with the styles below
+
+FRONT_STYLE = ButtonStyle(36, (14,8), hover=((80,80,80),(220,220,220),(255,255,255)))
+MENU_STYLE = ButtonStyle(24, (12,8), hover=((80,80,80),(220,220,220),(255,255,255)))
+OPTIONS_STYLE = ButtonStyle(22, (8,6), normal=((50,50,50),(200,200,200),(240,240,240)), hover=((70,70,70),(230,230,230),(255,255,255)))
+SLOT_STYLE = ButtonStyle(32, (16,12), normal=((50,50,50),(190,190,190),(230,230,230)), hover=((70,70,70),(220,220,220),(250,250,250)))
+STAGE_STYLE = ButtonStyle(28, center=True, normal=((60,60,60),(200,200,200),(240,240,240)),
+                          hover=((80,80,80),(230,230,230),(255,255,255)), disabled=((35,35,35),(110,110,110),(140,140,140)))
 
 def build_menu_buttons(window_w, window_h):
     w,h = 260,40
@@ -36,19 +46,36 @@ def build_front_menu(window_w, window_h):
     ]
 
 # slot and stage builders are below so Engine can populate actions/behavior
-def build_slot_buttons(window_w, window_h, slots):
+SLOT_PITCH = 72
+
+def slots_per_page(window_h):
+    # rows that fit above the pager and Back buttons
+    sy=(window_h - 300)//2
+    return max(1, (window_h - sy - 2*56 - 40)//SLOT_PITCH)
+
+def slot_label(s):
+    label=f"Slot {s['index']}"
+    if s["exists"]:
+        label += f" — Stage {s['stage']}"
+    return label
+
+def build_slot_buttons(window_w, window_h, slots, page=0, pages=1, sort="index"):
+    # slots: only the rows of the visible page; pager actions are "prev"/"sort"/"next"
     buttons=[]
     w,h=360,56
     sx=(window_w - w)//2
     sy=(window_h - 300)//2
     for i,s in enumerate(slots):
-        idx=s["index"]
-        label=f"Slot {idx}"
-        if s["exists"]:
-            label += f" — Stage {s['stage']}"
-        rect=Rect(sx, sy + i*72, w, h)
-        buttons.append((rect, label, idx))
-    back_rect=Rect(sx, sy + len(slots)*72, w, 44)
+        rect=Rect(sx, sy + i*SLOT_PITCH, w, h)
+        buttons.append((rect, slot_label(s), s["index"]))
+    py = sy + len(slots)*SLOT_PITCH
+    gap=8; bw=(w - 2*gap)//3
+    if page > 0:
+        buttons.append((Rect(sx, py, bw, 44), "< Prev", "prev"))
+    buttons.append((Rect(sx + bw + gap, py, bw, 44), "Recent" if sort == "recent" else "By slot", "sort"))
+    if page < pages - 1:
+        buttons.append((Rect(sx + 2*(bw + gap), py, bw, 44), "Next >", "next"))
+    back_rect=Rect(sx, py + 56, w, 44)
     buttons.append((back_rect, "Back", 0))
     return buttons
 
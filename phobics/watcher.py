@@ -0,0 +1,98 @@
+# phobics/watcher.py
+import os
+import io
+import queue
+import hashlib
+import threading
+
+from .settings import TEX_DIR, SND_DIR, STAGES_JSON
+from .loader import TEXTURE_FILES, SOUND_FILES
+
+# file name -> (kind, loader key)
+WATCHED = {}
+for _k,_f in TEXTURE_FILES.items(): WATCHED[os.path.join(TEX_DIR, _f)] = ("texture", _k)
+for _k,_f in SOUND_FILES.items(): WATCHED[os.path.join(SND_DIR, _f)] = ("sound", _k)
+WATCHED[str(STAGES_JSON)] = ("stages", None)
+
+class AssetWatcher:
+    """Polls asset files on a background thread and queues the ones that changed.
+
+    The thread only stats files and reads/hashes the ones whose mtime or size
+    moved; decoding (which needs the display) is left to the main thread via
+    poll(), so a reload costs one decode per changed file.
+    """
+
+    def __init__(self, interval=0.5, paths=None):
+        self.interval = interval
+        self.paths = dict(paths or WATCHED)
+        self.changes = queue.Queue()
+        self._stats = {}
+        self._hashes = {}
+        self._stop = threading.Event()
+        self._thread = None
+        # prime with the current state so startup does not count as a change
+        for path in self.paths:
+            st = self._stat(path)
+            self._stats[path] = st
+            if st is not None:
+                data = self._read(path)
+                if data is not None:
+                    self._hashes[path] = hashlib.md5(data).digest()
+
+    def _stat(self, path):
+        try:
+            st = os.stat(path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _read(self, path):
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def scan(self):
+        # one polling pass; returns the number of changes queued
+        n = 0
+        for path,(kind,key) in self.paths.items():
+            st = self._stat(path)
+            if st == self._stats.get(path):
+                continue
+            self._stats[path] = st
+            data = self._read(path) if st is not None else None
+            digest = hashlib.md5(data).digest() if data is not None else None
+            if digest == self._hashes.get(path):
+                continue  # touched but not modified
+            self._hashes[path] = digest
+            self.changes.put((kind, key, data))
+            n += 1
+        return n
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try: self.scan()
+            except Exception as e: print("[watch] scan failed:", e)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="phobics-asset-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def poll(self):
+        # drain pending changes; called from the main thread each frame.
+        # bytes are wrapped in BytesIO so loaders never touch the disk here.
+        out = []
+        while True:
+            try: kind,key,data = self.changes.get_nowait()
+            except queue.Empty: break
+            out.append((kind, key, io.BytesIO(data) if data is not None else None))
+        return out
@@ -0,0 +1,145 @@
+# phobics/widgets.py
+import pygame
+from pygame import Rect
+
+_fonts = {}
+
+def font(size):
+    f = _fonts.get(size)
+    if f is None:
+        f = _fonts[size] = pygame.font.SysFont(None, size)
+    return f
+
+class ButtonStyle:
+    # colours per state: (fill, border, text); hover falls back to normal
+    def __init__(self, size, pad=(12,8), normal=((60,60,60),(180,180,180),(240,240,240)), hover=None, disabled=None, center=False):
+        self.size = size; self.pad = pad; self.center = center
+        self.colors = {"normal": normal, "hover": hover or normal, "disabled": disabled or normal}
+
+class Widget:
+    def __init__(self, rect):
+        self.rect = Rect(rect)
+        self.panel = None
+
+    def changed(self):
+        if self.panel is not None: self.panel.dirty = True
+
+    def render(self):
+        return None
+
+class Label(Widget):
+    def __init__(self, text, size, color, **anchor):
+        super().__init__((0,0,0,0))
+        self.size = size; self.color = color; self.anchor = anchor or {"topleft": (0,0)}
+        self.text = None; self._surf = None
+        self.set_text(text)
+
+    def set_text(self, text):
+        if text == self.text: return
+        self.text = text
+        self._surf = font(self.size).render(text, True, self.color)
+        self.rect = self._surf.get_rect(**self.anchor)
+        self.changed()
+
+    def render(self):
+        return self._surf
+
+class Image(Widget):
+    def __init__(self, surf=None, **anchor):
+        super().__init__((0,0,0,0))
+        self.anchor = anchor; self.surf = None
+        self.set_image(surf)
+
+    def set_image(self, surf):
+        if surf is self.surf: return
+        self.surf = surf
+        if surf is not None: self.rect = surf.get_rect(**self.anchor)
+        self.changed()
+
+    def render(self):
+        return self.surf
+
+class Button(Widget):
+    """Rect + label + action; one cached surface per state (normal/hover/disabled)."""
+
+    def __init__(self, rect, label, action, style, enabled=True):
+        super().__init__(rect)
+        self.label = label; self.action = action; self.style = style
+        self.enabled = enabled; self.hover = False
+        self._surfs = {}
+
+    @property
+    def state(self):
+        if not self.enabled: return "disabled"
+        return "hover" if self.hover else "normal"
+
+    def set_label(self, label):
+        if label == self.label: return
+        self.label = label; self._surfs = {}; self.changed()
+
+    def set_hover(self, hover):
+        if hover == self.hover: return
+        self.hover = hover
+        if self.enabled: self.changed()
+
+    def render(self):
+        state = self.state
+        surf = self._surfs.get(state)
+        if surf is None:
+            fill,border,text = self.style.colors[state]
+            surf = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+            surf.fill(fill); pygame.draw.rect(surf, border, surf.get_rect(), 2)
+            txt = font(self.style.size).render(self.label, True, text)
+            if self.style.center:
+                surf.blit(txt, txt.get_rect(center=surf.get_rect().center))
+            else:
+                surf.blit(txt, self.style.pad)
+            self._surfs[state] = surf
+        return surf
+
+class Panel:
+    """A full-screen menu layer: overlay plus widgets, composed into one surface.
+
+    The composed surface is rebuilt only when a widget reports a change, so an
+    idle menu costs one blit per frame. hit()/hover() work on the same widgets.
+    """
+
+    def __init__(self, size, overlay=None):
+        self.size = size
+        self.overlay = overlay  # RGBA fill behind the widgets, or None
+        self.widgets = []
+        self.dirty = True
+        self.renders = 0
+        self._surf = None
+
+    def add(self, widget):
+        widget.panel = self; self.widgets.append(widget); self.dirty = True
+        return widget
+
+    def add_buttons(self, layout, style):
+        # layout: ui.build_* tuples (rect, label, action[, enabled])
+        return [self.add(Button(b[0], b[1], b[2], style, b[3] if len(b) > 3 else True)) for b in layout]
+
+    @property
+    def buttons(self):
+        return [w for w in self.widgets if isinstance(w, Button)]
+
+    def hit(self, pos):
+        for w in self.widgets:
+            if isinstance(w, Button) and w.enabled and w.rect.collidepoint(pos): return w
+        return None
+
+    def hover(self, pos):
+        for w in self.widgets:
+            if isinstance(w, Button): w.set_hover(w.rect.collidepoint(pos))
+
+    def render(self):
+        if self.dirty or self._surf is None:
+            surf = pygame.Surface(self.size, pygame.SRCALPHA)
+            surf.fill(self.overlay or (0,0,0,0))
+            surf.blits([(s, w.rect) for w in self.widgets for s in (w.render(),) if s is not None], doreturn=False)
+            self._surf = surf; self.dirty = False; self.renders += 1
+        return self._surf
+
+    def draw(self, screen):
+        screen.blit(self.render(), (0,0))
@@ -0,0 +1,29 @@
+# tests/test_pixcache.py
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+from phobics.pixcache import PixelCache
+
+def _decode(fileobj):
+    return pygame.image.load(fileobj, "t.png").convert_alpha()
+
+def _png(tmp_path):
+    src = pygame.Surface((8,6), pygame.SRCALPHA); src.fill((10,20,30,255))
+    path = tmp_path / "t.png"; pygame.image.save(src, str(path))
+    return path.read_bytes()
+
+def test_cached_texture_is_writable(tmp_path):
+    pygame.display.init(); pygame.display.set_mode((16,16))
+    data = _png(tmp_path)
+    PixelCache(tmp_path / "cache").load("t", data, _decode)  # miss: writes the entry
+    cache = PixelCache(tmp_path / "cache")
+    surf = cache.load("t", data, _decode)
+    assert cache.hits == 1
+    # used to segfault: the surface wrapped a read-only mmap
+    surf.fill((200,0,0,255)); surf.set_at((0,0), (0,200,0,255))
+    assert surf.get_at((1,1))[:3] == (200,0,0)
+    # the entry on disk is unchanged
+    again = PixelCache(tmp_path / "cache").load("t", data, _decode)
+    assert again.get_at((1,1))[:3] == (10,20,30)
@@ -0,0 +1,37 @@
+# tests/test_surfpool.py
+import random
+
+from phobics import bench  # first: selects the headless SDL drivers
+import pygame
+
+from phobics.surfpool import SurfaceCounter
+
+def _frame(engine, counted):
+    random.seed(bench.SEED)
+    bench.play(engine, 1); engine.reload_assets()
+    if counted:
+        with SurfaceCounter() as counter:
+            engine.reload_assets()  # cold caches: every sprite is rebuilt inside the block
+            engine.screen.fill((0,0,0)); engine.draw()
+        assert counter.count > 0
+    else:
+        engine.reload_assets()
+        engine.screen.fill((0,0,0)); engine.draw()
+    return pygame.image.tobytes(engine.screen, "RGB")
+
+def test_counter_does_not_change_drawing():
+    engine = bench.make_engine((320,240))
+    try:
+        plain = _frame(engine, False)
+        counted = _frame(engine, True)
+        assert isinstance(engine.scaled_sprite("enemy", (32,32)), pygame.Surface)
+    finally:
+        bench.close_engine(engine)
+    assert counted == plain
+
+def test_counter_restores_builders():
+    from phobics.widgets import Panel
+    render = Panel.render; smoothscale = pygame.transform.smoothscale
+    with SurfaceCounter():
+        assert Panel.render is not render
+    assert Panel.render is render and pygame.transform.smoothscale is smoothscale